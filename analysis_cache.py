@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Analysis Result Cache
+
+Remembers finished analyses across runs, so a ciphertext that comes back
+(as is, or differing only in case and spacing) skips the analysis. Entries
+are keyed by a hash of the normalized ciphertext, the analysis options, the
+solver version and the size and modification time of the data files the
+solver reads (profiles, lexicons, n-gram models, corpora), and live in the same SQLite file as the Gemini cache
+(see disk_cache), with least-recently-used eviction by count and size.
+
+Each entry keeps the result summary, the exact-text hash and how long the
+analysis took. Hit and miss counts and the analysis time saved by hits are
+kept as running totals in the same file, shared by every process. Each
+process counts its lookups in memory and adds them to the totals at most
+every FLUSH_SECONDS and when it exits, so lookups never wait on a write.
+
+Settings (environment variables):
+    LUKIN_ANALYSIS_CACHE_MB       size limit of the stored results (default: 64)
+    LUKIN_ANALYSIS_CACHE_ENTRIES  entry limit (default: 20000)
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import hashlib
+import os
+import threading
+import time
+from multiprocessing.util import Finalize
+
+from disk_cache import DiskCache, make_cache_key
+
+_COUNTERS_KEY = 'totals'
+
+# Seconds between writes of a process's lookup counts to the shared totals
+FLUSH_SECONDS = 5.0
+
+def normalize_ciphertext(text):
+    """Lowercase text with every whitespace run made a single space, as the cache keys see it."""
+    return ' '.join(text.lower().split())
+
+def text_digest(text):
+    """SHA-256 of the exact text."""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+def files_fingerprint(paths):
+    """Key part that changes when any of the files is added, removed, resized or modified."""
+    fingerprint = []
+    for path in sorted(set(paths)):
+        try:
+            status = os.stat(path)
+        except OSError:
+            fingerprint.append([path, None])
+        else:
+            fingerprint.append([path, status.st_size, status.st_mtime_ns])
+    return make_cache_key(fingerprint)
+
+class AnalysisCache:
+    """Persistent store of analysis result summaries with hit/miss and time-saved statistics."""
+
+    def __init__(self, path=None, max_entries=None, max_bytes=None):
+        if max_entries is None:
+            max_entries = int(os.getenv('LUKIN_ANALYSIS_CACHE_ENTRIES', '20000'))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('LUKIN_ANALYSIS_CACHE_MB', '64')) * 1024 * 1024)
+        self.results = DiskCache('analysis-results', path, max_entries=max_entries, max_bytes=max_bytes)
+        self.counters = DiskCache('analysis-cache-stats', path, max_entries=None)
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self._pending = {}
+        self._pending_pid = None
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+
+    def key(self, text, options, version, data=None):
+        """Cache key of a ciphertext analyzed with the given options by the given solver version.
+
+        data is the files_fingerprint() of the data files the solver read.
+        """
+        return make_cache_key(normalize_ciphertext(text), options, version, data)
+
+    def get(self, key):
+        """The stored entry ({'summary', 'digest', 'seconds'}) for key, or None.
+
+        Lookups are counted by record_hit() or record_miss(), since the caller
+        decides whether an entry can be used.
+        """
+        return self.results.get(key)
+
+    def record_hit(self, entry, seconds):
+        """Count a hit that took seconds to serve, crediting the analysis time it saved."""
+        saved = max(entry['seconds'] - seconds, 0.0)
+        self.hits += 1
+        self.seconds_saved += saved
+        self._count({'hits': 1, 'seconds_saved': saved})
+
+    def record_miss(self):
+        """Count a lookup that found no usable entry."""
+        self.misses += 1
+        self._count({'misses': 1})
+
+    def _count(self, amounts):
+        """Add to the counts not yet in the shared totals, flushing them when FLUSH_SECONDS have passed."""
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                # A forked worker leaves its parent's counts to the parent,
+                # and flushes its own when it exits
+                self._pending = {}
+                self._pending_pid = os.getpid()
+                self._flushed = time.monotonic()
+                Finalize(self, self.flush, exitpriority=0)
+            for name, amount in amounts.items():
+                self._pending[name] = self._pending.get(name, 0) + amount
+            due = time.monotonic() - self._flushed >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add this process's lookup counts since the last flush to the shared totals."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+        if pending:
+            self.counters.add(_COUNTERS_KEY, pending)
+
+    def put(self, key, text, summary, seconds):
+        """Store the summary of an analysis of text that took seconds."""
+        self.results.set(key, {'summary': summary, 'digest': text_digest(text), 'seconds': seconds})
+
+    def clear(self):
+        """Drop every stored result and the running totals."""
+        with self._lock:
+            self._pending = {}
+        self.results.clear()
+        self.counters.clear()
+
+    def stats(self):
+        """Stored entries and bytes, and hits, misses, hit rate and time saved, in this process and overall."""
+        self.flush()
+        stats = self.results.stats()
+        lookups = self.hits + self.misses
+        totals = self.counters.add(_COUNTERS_KEY, {})
+        total_lookups = totals.get('hits', 0) + totals.get('misses', 0)
+        return {
+            'entries': stats['entries'],
+            'bytes': stats['bytes'],
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'seconds_saved': self.seconds_saved,
+            'total_hits': totals.get('hits', 0),
+            'total_misses': totals.get('misses', 0),
+            'total_hit_rate': totals.get('hits', 0) / total_lookups if total_lookups else None,
+            'total_seconds_saved': totals.get('seconds_saved', 0.0),
+        }
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Analysis Results
+
+Compact result objects returned by cipher_analyzer.analyze(): one Candidate
+per decryption (plaintext, score, method, language and key) and an
+AnalysisResult holding the detection outcome, the best and alternative
+candidates and the stage timings of the run.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import math
+
+def _finite(value):
+    """Make scores JSON-safe (-inf is not valid JSON)."""
+    return value if isinstance(value, (int, float)) and math.isfinite(value) else None
+
+class Candidate:
+    """One decryption: plaintext, score, method, language and key (Caesar shift, affine key, mapping or Vigenère key word)."""
+
+    __slots__ = ('text', 'score', 'method', 'language', 'shift', 'mapping', 'keyword', 'period', 'affine_key',
+                 'ai_refined')
+
+    def __init__(self, text, score, method, language=None, shift=None, mapping=None, ai_refined=False,
+                 keyword=None, period=None, affine_key=None):
+        self.text = text
+        self.score = score
+        self.method = method
+        self.language = language
+        self.shift = shift
+        self.mapping = mapping
+        self.keyword = keyword
+        self.period = period
+        self.affine_key = affine_key
+        self.ai_refined = ai_refined
+
+    @classmethod
+    def from_dict(cls, result):
+        """Build a candidate from the result dict of one of the analysis methods."""
+        return cls(result['text'], result['score'], result['method'], result.get('language'),
+                   result.get('shift'), result.get('mapping'), bool(result.get('ai_refined')),
+                   result.get('keyword'), result.get('period'), result.get('affine_key'))
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Rebuild a candidate from its to_dict() summary."""
+        affine_key = summary.get('affine_key')
+        return cls(summary['text'], summary['score'] if summary['score'] is not None else -math.inf,
+                   summary['method'], summary.get('language'), summary.get('shift'), summary.get('mapping'),
+                   bool(summary.get('ai_refined')), summary.get('keyword'), summary.get('period'),
+                   tuple(affine_key) if affine_key is not None else None)
+
+    @property
+    def key(self):
+        """The Caesar shift, the affine (multiplier, offset), the Vigenère key word, or the substitution mapping."""
+        if self.shift is not None:
+            return self.shift
+        if self.affine_key is not None:
+            return self.affine_key
+        return self.keyword if self.keyword is not None else self.mapping
+
+    def to_dict(self):
+        """JSON-serializable summary."""
+        summary = {
+            'method': self.method,
+            'language': self.language,
+            'score': _finite(self.score),
+            'text': self.text,
+        }
+        if self.shift is not None:
+            summary['shift'] = self.shift
+        elif self.affine_key is not None:
+            summary['affine_key'] = list(self.affine_key)
+        elif self.keyword is not None:
+            summary['keyword'] = self.keyword
+            summary['period'] = self.period
+        elif self.mapping is not None:
+            summary['mapping'] = self.mapping
+        if self.ai_refined:
+            summary['ai_refined'] = True
+        return summary
+
+    def __repr__(self):
+        return f'Candidate(method={self.method!r}, language={self.language!r}, score={self.score:.1f}, key={self.key!r})'
+
+class AnalysisResult:
+    """Outcome of analyze(): detection, best and alternative candidates, and stage timings."""
+
+    __slots__ = ('total_letters', 'letter_counts', 'encrypted', 'best', 'alternative', 'timings')
+
+    def __init__(self, total_letters, letter_counts, encrypted, best=None, alternative=None, timings=None):
+        self.total_letters = total_letters
+        self.letter_counts = letter_counts
+        self.encrypted = encrypted
+        self.best = best
+        self.alternative = alternative
+        self.timings = timings
+
+    @property
+    def text(self):
+        """Best plaintext, or None when nothing was decrypted."""
+        return self.best.text if self.best else None
+
+    @property
+    def score(self):
+        """Score of the best candidate, or None."""
+        return self.best.score if self.best else None
+
+    @property
+    def language(self):
+        """Language of the best candidate, or None."""
+        return self.best.language if self.best else None
+
+    @property
+    def key(self):
+        """Key of the best candidate (shift, affine key, key word or mapping), or None."""
+        return self.best.key if self.best else None
+
+    def to_dict(self, include_timings=True):
+        """JSON-serializable summary."""
+        summary = {
+            'encrypted': self.encrypted,
+            'total_letters': self.total_letters,
+            'best': self.best.to_dict() if self.best else None,
+            'alternative': self.alternative.to_dict() if self.alternative else None,
+        }
+        if include_timings and self.timings is not None:
+            summary['timings'] = self.timings
+        return summary
+
+    def __repr__(self):
+        return f'AnalysisResult(encrypted={self.encrypted}, total_letters={self.total_letters}, best={self.best!r})'
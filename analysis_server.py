@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Analysis Server
+
+Keeps the analyzer warm in one long-lived process and serves analyses over
+local HTTP, on a TCP port or a Unix socket. Worker processes load the
+lexicons and word pattern indexes once at startup, so a request pays for
+its analysis and a few hundred microseconds of transport, not for
+interpreter startup and imports. Connections are kept alive between
+requests, and a batch of texts goes to the workers in one round trip.
+
+Endpoints:
+    POST /analyze   {"text": "...", "options": {...}} -> one result
+                    {"texts": ["...", ...], "options": {...}} -> {"results": [...]}
+    GET  /health    {"status": "ok", ...}
+    GET  /metrics   request, text, error and timing counters
+
+Options are use_ai, search, restarts and cache, as on the command line.
+
+Usage:
+    python cipher_analyzer.py serve --port 8642 -w 4
+    python cipher_analyzer.py serve --socket /tmp/lukin.sock
+    curl -s localhost:8642/analyze -d '{"text": "WKH TXLFN EURZQ IRA"}'
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool
+
+from cipher_analyzer import analyze, get_dictionary, get_lexicon, get_pattern_index
+
+DEFAULT_PORT = 8642
+
+# Larger request bodies are refused with 413
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# analyze() options a request may set, with their types
+REQUEST_OPTIONS = {'use_ai': bool, 'search': bool, 'restarts': int, 'cache': bool}
+
+def warm_up():
+    """Load the per-language word data that the first analysis would otherwise pay for."""
+    for language in ('english', 'french'):
+        get_lexicon(language)
+        get_pattern_index(language)
+        get_dictionary(language)
+
+def _init_worker():
+    """Pool initializer: warm up, and leave Ctrl+C to the server process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    warm_up()
+
+def analyze_item(packed):
+    """Analyze one text with the given options, turning any failure into an error record."""
+    text, options = packed
+    try:
+        return analyze(text, **options).to_dict(include_timings=False)
+    except Exception as e:
+        return {'error': f'{type(e).__name__}: {e}'}
+
+def parse_content_length(value):
+    """Body length from a Content-Length header (0 when absent), raising ValueError when invalid."""
+    if value is None:
+        return 0
+    try:
+        length = int(value)
+    except ValueError:
+        raise ValueError(f'invalid Content-Length: {value!r}') from None
+    if length < 0:
+        raise ValueError(f'invalid Content-Length: {value!r}')
+    return length
+
+def parse_options(options):
+    """Validate the options of a request, raising ValueError for unknown or mistyped ones."""
+    if options is None:
+        return {}
+    if not isinstance(options, dict):
+        raise ValueError('"options" must be an object')
+    parsed = {}
+    for name, value in options.items():
+        expected = REQUEST_OPTIONS.get(name)
+        if expected is None:
+            raise ValueError(f'unknown option "{name}"')
+        # bool is an int subclass; do not accept true as a restart count
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f'option "{name}" must be {expected.__name__}')
+        parsed[name] = value
+    return parsed
+
+class AnalysisService:
+    """The worker pool plus the counters reported by /metrics."""
+
+    def __init__(self, workers=None, chunksize=1):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunksize = chunksize
+        self.started = time.time()
+        self.metrics = {
+            'requests': 0, 'batches': 0, 'texts': 0, 'errors': 0, 'rejected': 0,
+            'analysis_seconds': 0.0, 'max_request_seconds': 0.0,
+        }
+        self._lock = threading.Lock()
+        if self.workers > 0:
+            self.pool = Pool(processes=self.workers, initializer=_init_worker)
+        else:
+            # Analyze on the request threads of this process
+            self.pool = None
+            warm_up()
+
+    def analyze_texts(self, texts, options):
+        """Analyze texts in order and return their result records."""
+        start = time.perf_counter()
+        items = [(text, options) for text in texts]
+        if self.pool is None:
+            results = [analyze_item(item) for item in items]
+        else:
+            results = self.pool.map(analyze_item, items, chunksize=self.chunksize)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.metrics['requests'] += 1
+            self.metrics['batches'] += len(texts) > 1
+            self.metrics['texts'] += len(texts)
+            self.metrics['errors'] += sum('error' in result for result in results)
+            self.metrics['analysis_seconds'] += elapsed
+            self.metrics['max_request_seconds'] = max(self.metrics['max_request_seconds'], elapsed)
+        return results
+
+    def count_rejected(self):
+        """Count a request refused before analysis."""
+        with self._lock:
+            self.metrics['rejected'] += 1
+
+    def health(self):
+        """Liveness summary for /health."""
+        return {'status': 'ok', 'pid': os.getpid(), 'workers': self.workers,
+                'uptime_s': round(time.time() - self.started, 3)}
+
+    def report(self):
+        """Counters for /metrics, with the mean analysis time per text."""
+        with self._lock:
+            report = dict(self.metrics)
+        report['uptime_s'] = round(time.time() - self.started, 3)
+        report['workers'] = self.workers
+        report['mean_text_ms'] = report['analysis_seconds'] / report['texts'] * 1000 if report['texts'] else None
+        return report
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Routes /analyze, /health and /metrics to the server's AnalysisService."""
+
+    # Keep-alive connections spare a pipeline the connection setup per message
+    protocol_version = 'HTTP/1.1'
+    verbose = False
+
+    def setup(self):
+        """Send small responses at once; Nagle's algorithm would hold them for the client's ACK."""
+        # Only TCP connections have the option; Unix socket clients have no address tuple
+        self.disable_nagle_algorithm = isinstance(self.client_address, tuple)
+        super().setup()
+
+    def do_GET(self):
+        """Handle GET /health and /metrics."""
+        path = self.path.split('?')[0]
+        if path == '/health':
+            self._send_json(200, self.server.service.health())
+        elif path == '/metrics':
+            self._send_json(200, self.server.service.report())
+        else:
+            self._send_json(404, {'error': f'no such endpoint: {path}'})
+
+    def do_POST(self):
+        """Handle POST /analyze with one text or a batch."""
+        service = self.server.service
+        if self.path.split('?')[0] != '/analyze':
+            self._send_json(404, {'error': f'no such endpoint: {self.path}'})
+            return
+
+        length = None
+        try:
+            length = parse_content_length(self.headers.get('Content-Length'))
+            if length > MAX_BODY_BYTES:
+                service.count_rejected()
+                self.close_connection = True
+                self._send_json(413, {'error': f'request body over {MAX_BODY_BYTES} bytes'})
+                return
+
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError('expected a JSON object')
+            options = parse_options(request.get('options'))
+            if 'texts' in request:
+                texts = request['texts']
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError('"texts" must be a list of strings')
+            elif isinstance(request.get('text'), str):
+                texts = [request['text']]
+            else:
+                raise ValueError('expected a "text" string or a "texts" list')
+        except ValueError as e:
+            service.count_rejected()
+            if length is None:
+                # Without a valid length the body cannot be skipped to reuse the connection
+                self.close_connection = True
+            self._send_json(400, {'error': str(e)})
+            return
+
+        results = service.analyze_texts(texts, options)
+        self._send_json(200, {'results': results} if 'texts' in request else results[0])
+
+    def _send_json(self, status, payload):
+        """Write a JSON response with its length, so the connection can be reused."""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        """Client address for the log; Unix socket clients have none."""
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        """Log requests only with --verbose."""
+        if self.verbose:
+            super().log_message(format, *args)
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None):
+    """HTTP server bound to host:port, or to socket_path when given, serving service."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left over from a server that did not shut down cleanly
+        server = ThreadingUnixHTTPServer(socket_path, AnalysisRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.service = service
+    return server
+
+def serve_main(argv=None):
+    """Command line entry point for the analysis server."""
+    parser = argparse.ArgumentParser(
+        prog='cipher_analyzer.py serve',
+        description='Serve analyses over local HTTP from warm worker processes',
+        epilog='Examples:\n  python cipher_analyzer.py serve\n  python cipher_analyzer.py serve --port 9000 -w 8\n  python cipher_analyzer.py serve --socket /tmp/lukin.sock\n  curl -s localhost:8642/analyze -d \'{"texts": ["WKH TXLFN", "EURZQ IRA"]}\'',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of a TCP port')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count; 0 analyzes in the server process)')
+    parser.add_argument('--chunksize', type=int, default=1, help='Texts of a batch sent to a worker at a time (default: 1)')
+    parser.add_argument('--ai-offline', action='store_true', help='Serve AI refinements from the cache only')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args(argv)
+    if args.socket and not hasattr(socketserver, 'UnixStreamServer'):
+        parser.error('Unix sockets are not available on this platform')
+    if args.ai_offline:
+        # Inherited by the worker processes
+        os.environ['LUKIN_AI_OFFLINE'] = '1'
+    AnalysisRequestHandler.verbose = args.verbose
+
+    service = AnalysisService(args.workers, args.chunksize)
+    try:
+        server = make_server(service, args.host, args.port, args.socket)
+    except OSError as e:
+        service.close()
+        print(f"❌ Cannot listen: {e}", file=sys.stderr)
+        return 1
+
+    where = args.socket or f'http://{args.host}:{server.server_address[1]}'
+    print(f"🚀 Serving analyses on {where} with {service.workers} workers (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped.", file=sys.stderr)
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(serve_main())
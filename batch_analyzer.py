@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Batch Analyzer
+
+Analyzes many ciphertexts in one run, spreading the work over a process pool
+and streaming one JSON result per line in input order. Inputs can be
+directories, glob patterns, plain text files (one ciphertext per file) or
+JSONL files (one ciphertext per line).
+
+Usage:
+    python cipher_analyzer.py batch intercepts/ "extra/*.txt" messages.jsonl -w 8
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from cipher_analyzer import analyze
+
+def iter_batch_items(sources):
+    """Yield (item_id, text, path) for every input, with text None when it must be read from path."""
+    for source in sources:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                path = os.path.join(source, name)
+                if os.path.isfile(path):
+                    yield path, None, path
+        elif source.endswith('.jsonl') and os.path.isfile(source):
+            yield from _iter_jsonl_items(source)
+        elif os.path.isfile(source):
+            yield source, None, source
+        else:
+            matches = sorted(path for path in glob.glob(source) if os.path.isfile(path))
+            if not matches:
+                yield source, None, source  # reported as a per-item error
+            for path in matches:
+                yield path, None, path
+
+def _iter_jsonl_items(path):
+    """Yield items from a JSONL file of {"id": ..., "text": ...} objects or bare strings."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            default_id = f'{path}:{line_number}'
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield default_id, ValueError(f'invalid JSON: {e}'), None
+                continue
+            if isinstance(record, str):
+                yield default_id, record, None
+            elif isinstance(record, dict) and isinstance(record.get('text'), str):
+                yield record.get('id', default_id), record['text'], None
+            else:
+                yield default_id, ValueError('expected a string or an object with a "text" field'), None
+
+def analyze_batch_item(item, options):
+    """Analyze one batch item, turning any failure into an error record."""
+    item_id, text, path = item
+    try:
+        if isinstance(text, Exception):
+            raise text
+        if text is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+
+        record = {'id': item_id}
+        record.update(analyze(text, **options).to_dict(include_timings=False))
+        return record
+    except Exception as e:
+        return {'id': item_id, 'error': f'{type(e).__name__}: {e}'}
+
+def _analyze_with_options(packed):
+    """Pool entry point; options travel with each item."""
+    return analyze_batch_item(*packed)
+
+def run_batch(sources, output, workers=None, chunksize=4, options=None):
+    """Analyze every input and write one JSON line per item in input order."""
+    options = options or {}
+    items = ((item, options) for item in iter_batch_items(sources))
+
+    if workers == 1:
+        results = map(_analyze_with_options, items)
+        return _write_results(results, output)
+
+    with Pool(processes=workers) as pool:
+        # imap keeps input order while results stream out as chunks finish
+        results = pool.imap(_analyze_with_options, items, chunksize=chunksize)
+        counts = _write_results(results, output)
+        # Let the workers exit on their own, so they flush their analysis cache counts
+        pool.close()
+        pool.join()
+        return counts
+
+def _write_results(results, output):
+    """Stream JSON lines to output and return (items, errors)."""
+    count = errors = 0
+    for record in results:
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+        count += 1
+        errors += 'error' in record
+    return count, errors
+
+def batch_main(argv=None):
+    """Command line entry point for batch analysis."""
+    parser = argparse.ArgumentParser(
+        prog='cipher_analyzer.py batch',
+        description='Analyze many ciphertexts and stream one JSON result per line',
+        epilog='Examples:\n  python cipher_analyzer.py batch intercepts/\n  python cipher_analyzer.py batch "inbox/*.txt" -w 8 -o results.jsonl\n  python cipher_analyzer.py batch messages.jsonl --chunksize 32',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('inputs', nargs='+', help='Directories, glob patterns, text files or JSONL files')
+    parser.add_argument('-o', '--output', help='Write JSON lines to a file instead of stdout')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=4, help='Items sent to a worker at a time (default: 4)')
+    parser.add_argument('--ai', action='store_true', help='Enable Gemini AI refinement')
+    parser.add_argument('--ai-offline', action='store_true', help='Use only cached AI refinements, never the network (implies --ai)')
+    parser.add_argument('--search', action='store_true', help='Search for the substitution key with hill-climbing (slower)')
+    parser.add_argument('--restarts', type=int, default=10, help='Random restarts for --search (default: 10)')
+    parser.add_argument('--cache', action='store_true', help='Answer ciphertexts analyzed before from the local analysis cache')
+
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.ai_offline:
+        # Inherited by the worker processes
+        os.environ['LUKIN_AI_OFFLINE'] = '1'
+    options = {'use_ai': args.ai or args.ai_offline, 'search': args.search, 'restarts': args.restarts,
+               'cache': args.cache}
+
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                count, errors = run_batch(args.inputs, output, args.workers, args.chunksize, options)
+        else:
+            count, errors = run_batch(args.inputs, sys.stdout, args.workers, args.chunksize, options)
+    except KeyboardInterrupt:
+        print("\n👋 Batch interrupted by user.", file=sys.stderr)
+        return 1
+
+    if errors:
+        print(f"⚠️  Analyzed {count} items ({errors} errors)", file=sys.stderr)
+        return 1
+    print(f"✅ Analyzed {count} items ({errors} errors)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(batch_main())
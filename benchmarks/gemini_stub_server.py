@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Local Gemini API Stub
+
+A minimal stand-in for the Gemini REST endpoint (models/<model>:generateContent)
+for measuring AI-assisted wall-clock time without network access or an API key.
+Every request waits --delay seconds, then echoes the partially decoded text
+from the prompt with a few letter fixes applied.
+
+Usage:
+    python benchmarks/gemini_stub_server.py --port 8765 --delay 1.0
+    GEMINI_API_KEY=stub GEMINI_API_ENDPOINT=http://127.0.0.1:8765 \\
+        python cipher_analyzer.py -f sample_texts/cipher_sample.txt --ai
+
+With the concurrent refinement path, the analysis should take about one
+--delay however many candidates are refined.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_DECODED_TEXT = re.compile(r'PARTIALLY DECODED TEXT: "(.*?)"\nTARGET LANGUAGE', re.DOTALL)
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    """Answers generateContent requests with a canned correction."""
+
+    delay = 0.0
+    fixes = str.maketrans('qk', 'uh')
+
+    def do_POST(self):
+        """Handle POST .../models/<model>:generateContent."""
+        if not self.path.split('?')[0].endswith(':generateContent'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            prompt = request['contents'][0]['parts'][0]['text']
+        except (ValueError, KeyError, IndexError):
+            self.send_error(400, 'Malformed generateContent request')
+            return
+
+        time.sleep(self.delay)
+        match = _DECODED_TEXT.search(prompt)
+        answer = match.group(1).translate(self.fixes) if match else ''
+        body = json.dumps({
+            'candidates': [{
+                'content': {'parts': [{'text': f'CORRECTED: {answer}'}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }]
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Log one line per request to stderr."""
+        sys.stderr.write(f"📨 {self.command} {self.path.split('?')[0]} ({self.delay:g}s)\n")
+
+def main():
+    """Run the stub server until interrupted."""
+    parser = argparse.ArgumentParser(description='Local Gemini API stub for AI refinement benchmarks')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--delay', type=float, default=1.0, help='Simulated round-trip time in seconds (default: 1.0)')
+    args = parser.parse_args()
+
+    GeminiStubHandler.delay = args.delay
+    server = ThreadingHTTPServer((args.host, args.port), GeminiStubHandler)
+    print(f"🧪 Gemini stub listening on http://{args.host}:{args.port} (delay {args.delay:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stub server stopped.")
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Hot Path Micro-Benchmarks
+
+Times the core analysis functions on deterministic synthetic ciphertext at
+input sizes from 100 bytes up to 100 MB, reports throughput in MB/s, and
+compares it with a JSON baseline recorded on the same machine.
+
+Usage:
+    python benchmarks/micro_benchmark.py --save-baseline
+    python benchmarks/micro_benchmark.py                      # compare with the baseline
+    python benchmarks/micro_benchmark.py --only caesar --sizes 1K,1M --threshold 0.1
+
+Exits with status 1 when a benchmark's throughput drops more than --threshold
+below the baseline.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from cipher_analyzer import (
+    ENGLISH_FREQ, ENGLISH_WORDS, FRENCH_WORDS, analyze_letter_frequency, apply_substitution,
+    caesar_decrypt, calculate_language_score, detect_language, frequency_substitution_analysis,
+    is_likely_encrypted, try_all_caesar_shifts
+)
+from word_patterns import read_text_words
+
+DEFAULT_BASELINE = os.path.join(REPO_DIR, 'benchmarks', 'baseline.json')
+
+SIZE_UNITS = {'K': 1000, 'M': 1000 ** 2, 'G': 1000 ** 3}
+DEFAULT_SIZES = '100,10K,1M,100M'
+
+# Unique text generated before the block is repeated up to larger sizes
+SYNTHETIC_BLOCK_SIZE = 1000 ** 2
+
+SUBSTITUTION_KEY = dict(zip(string.ascii_lowercase, random.Random(7).sample(string.ascii_lowercase, 26)))
+
+# (name, function of the ciphertext, largest size it runs at by default);
+# the word-based paths run in Python per character or per word and stop earlier
+BENCHMARKS = [
+    ('analyze_letter_frequency', analyze_letter_frequency, 100 * 1000 ** 2),
+    ('caesar_decrypt', lambda text: caesar_decrypt(text, 3), 100 * 1000 ** 2),
+    ('try_all_caesar_shifts', try_all_caesar_shifts, 100 * 1000 ** 2),
+    ('apply_substitution', lambda text: apply_substitution(text, SUBSTITUTION_KEY), 100 * 1000 ** 2),
+    ('calculate_language_score', lambda text: calculate_language_score(text, ENGLISH_FREQ), 100 * 1000 ** 2),
+    ('detect_language', detect_language, 1000 ** 2),
+    ('is_likely_encrypted', is_likely_encrypted, 10 * 1000 ** 2),
+    ('frequency_substitution_analysis', frequency_substitution_analysis, 1000 ** 2),
+]
+
+def parse_size(value):
+    """Parse sizes like 100, 10K, 1M or 100M (decimal units) into bytes."""
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+def format_size(size):
+    """Short label for a byte count, e.g. 10000 -> '10K'."""
+    for unit, factor in sorted(SIZE_UNITS.items(), key=lambda x: x[1], reverse=True):
+        if size >= factor and size % factor == 0:
+            return f'{size // factor}{unit}'
+    return str(size)
+
+def synthetic_plaintext(size, seed=0):
+    """Deterministic English/French word salad of exactly size characters."""
+    rng = random.Random(seed)
+    vocabulary = sorted(set(ENGLISH_WORDS + FRENCH_WORDS + read_text_words(
+        [os.path.join(REPO_DIR, 'corpora', 'english.txt'), os.path.join(REPO_DIR, 'corpora', 'french.txt')])))
+    punctuation = ['', '', '', '', '', ',', '.', '.\n']
+
+    parts = []
+    length = 0
+    while length < min(size, SYNTHETIC_BLOCK_SIZE):
+        word = rng.choice(vocabulary) + rng.choice(punctuation) + ' '
+        if rng.random() < 0.05:
+            word = word.capitalize()
+        parts.append(word)
+        length += len(word)
+    block = ''.join(parts)
+    return (block * (size // len(block) + 1))[:size]
+
+def time_call(function, text, min_time, max_runs):
+    """Best wall time of function(text) over repeated runs lasting at least min_time in total.
+
+    One untimed call comes first, so that tables built once per process
+    (lru_cache'd lexicons, pattern indexes, n-gram tables) are not timed.
+    """
+    function(text)
+    best = float('inf')
+    elapsed = 0.0
+    runs = 0
+    while runs < max_runs and (runs == 0 or elapsed < min_time):
+        start = time.perf_counter()
+        function(text)
+        duration = time.perf_counter() - start
+        best = min(best, duration)
+        elapsed += duration
+        runs += 1
+    return best, runs
+
+def run_benchmarks(sizes, only=None, min_time=0.2, max_runs=50, respect_limits=True):
+    """Run every selected benchmark at every size and return {'name@size': result}."""
+    results = {}
+    selected = [bench for bench in BENCHMARKS if not only or any(part in bench[0] for part in only)]
+
+    with open(os.devnull, 'w') as devnull:
+        for size in sizes:
+            runnable = [bench for bench in selected if not respect_limits or size <= bench[2]]
+            if not runnable:
+                continue
+            ciphertext = caesar_decrypt(synthetic_plaintext(size), -3)
+            for name, function, _ in runnable:
+                # The analysis functions print progress; keep it out of the report
+                with contextlib.redirect_stdout(devnull):
+                    seconds, runs = time_call(function, ciphertext, min_time, max_runs)
+                throughput = size / seconds / 1000 ** 2 if seconds > 0 else float('inf')
+                key = f'{name}@{format_size(size)}'
+                results[key] = {'function': name, 'size': size, 'seconds': seconds,
+                                'runs': runs, 'mb_per_s': throughput}
+                print(f"{name:<32} | {format_size(size):>5} | {seconds * 1000:11.3f}ms | {throughput:10.3f} MB/s | {runs:>3} runs")
+    return results
+
+def compare_with_baseline(results, baseline, threshold):
+    """Return failure messages for benchmarks whose throughput fell past the threshold."""
+    failures = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        ratio = result['mb_per_s'] / previous['mb_per_s'] if previous['mb_per_s'] else float('inf')
+        if ratio < 1 - threshold:
+            failures.append(f"{key}: {result['mb_per_s']:.2f} MB/s vs {previous['mb_per_s']:.2f} MB/s baseline ({(1 - ratio) * 100:.0f}% slower)")
+    return failures
+
+def main():
+    """Run the micro-benchmarks and record or check a baseline."""
+    parser = argparse.ArgumentParser(description='Throughput benchmarks for the analysis hot paths')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated input sizes in bytes, K/M suffixes allowed (default: {DEFAULT_SIZES})')
+    parser.add_argument('--only', help='Comma-separated substrings of the benchmark names to run')
+    parser.add_argument('--all-sizes', action='store_true',
+                        help='Run the slow word-based benchmarks at every size too')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Minimum total seconds spent per benchmark and size (default: 0.2)')
+    parser.add_argument('--max-runs', type=int, default=50, help='Maximum runs per benchmark and size (default: 50)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results to the baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed throughput drop as a fraction of the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    only = [part.strip() for part in args.only.split(',')] if args.only else None
+
+    print(f"🐍 Python {platform.python_version()} on {platform.machine()}")
+    print(f"{'Benchmark':<32} | {'Size':>5} | {'Best time':>13} | {'Throughput':>15} | Runs")
+    print("-" * 86)
+    results = run_benchmarks(sizes, only, args.min_time, args.max_runs, respect_limits=not args.all_sizes)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f).get('results', {})
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': baseline}, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.baseline} ({len(results)} results)")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get('results', {})
+    failures = compare_with_baseline(results, baseline, args.threshold)
+    if failures:
+        print(f"\n❌ Throughput regressed more than {args.threshold:.0%}:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    compared = sum(1 for key in results if key in baseline)
+    print(f"\n✅ {compared} results within {args.threshold:.0%} of the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
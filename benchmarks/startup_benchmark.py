@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Startup Time Benchmark
+
+Runs the no-graph, no-AI command line paths in fresh interpreters and checks
+that (1) none of the heavy optional dependencies get imported and (2) the
+startup overhead over a bare interpreter stays within a fixed budget.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --budget-ms 80 --runs 9
+
+Exits with status 1 when a scenario goes over budget or imports a heavy module.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEMO_CIPHER = "WKH TXLFN EURZQ IRA MXPSV RYHU WKH ODCB GRJ"
+
+# Modules that must only be loaded for -g/--graph, --ai or the viewer graph
+HEAVY_MODULES = ('matplotlib', 'google', 'dotenv')
+
+SCENARIOS = [
+    ('analyzer --freq-only', ['cipher_analyzer.py', '--freq-only', DEMO_CIPHER]),
+    ('analyzer Caesar solve', ['cipher_analyzer.py', DEMO_CIPHER]),
+    ('viewer --no-graph', ['frequency_viewer.py', DEMO_CIPHER, '--no-graph']),
+]
+
+def run_once(args, importtime=False):
+    """Run a command in a fresh interpreter and return (seconds, stderr)."""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {completed.returncode}:\n{completed.stderr}")
+    return elapsed, completed.stderr
+
+def median_runtime(args, runs):
+    """Median wall time of a command over several runs."""
+    return statistics.median(run_once(args)[0] for _ in range(runs))
+
+def imported_heavy_modules(args):
+    """Heavy modules that a command imports, read from -X importtime output."""
+    _, stderr = run_once(args, importtime=True)
+    found = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        name = line.rsplit('|', 1)[-1].strip()
+        root = name.split('.')[0]
+        if root in HEAVY_MODULES:
+            found.add(root)
+    return sorted(found)
+
+def main():
+    """Run every startup scenario and compare it against the budget."""
+    parser = argparse.ArgumentParser(description='Check the fast-start path of the command line tools')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Allowed startup overhead over a bare interpreter in ms (default: 100)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per scenario, the median is used (default: 5)')
+    args = parser.parse_args()
+
+    baseline = median_runtime(['-c', 'pass'], args.runs)
+    print(f"🐍 Bare interpreter: {baseline * 1000:.1f} ms")
+    print(f"{'Scenario':<24} | {'Total':>9} | {'Overhead':>9} | Heavy imports")
+    print("-" * 64)
+
+    failures = []
+    for name, command in SCENARIOS:
+        total = median_runtime(command, args.runs)
+        overhead_ms = (total - baseline) * 1000
+        heavy = imported_heavy_modules(command)
+        print(f"{name:<24} | {total * 1000:7.1f}ms | {overhead_ms:7.1f}ms | {', '.join(heavy) or 'none'}")
+
+        if overhead_ms > args.budget_ms:
+            failures.append(f"{name}: {overhead_ms:.1f} ms over the {args.budget_ms:.0f} ms budget")
+        if heavy:
+            failures.append(f"{name}: imported {', '.join(heavy)}")
+
+    if failures:
+        print("\n❌ Startup budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print(f"\n✅ All scenarios within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,100 +10,187 @@ License: MIT
 Version: 1.0.0
 """
 
-import matplotlib.pyplot as plt
 import string
 from collections import Counter
+from functools import lru_cache
 import sys
 import argparse
+import contextlib
+import contextvars
+import json
 import os
+import time
 
-# Environment variables
-try:
-    from dotenv import load_dotenv
-    load_dotenv()  # Load environment variables from .env file
-    DOTENV_AVAILABLE = True
-except ImportError:
-    DOTENV_AVAILABLE = False
-
-# Google Gemini AI integration
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-
-# Expected letter frequencies in English (percentages)
-ENGLISH_FREQ = {
-    'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7, 's': 6.3, 'h': 6.1,
-    'r': 6.0, 'd': 4.3, 'l': 4.0, 'c': 2.8, 'u': 2.8, 'm': 2.4, 'w': 2.4, 'f': 2.2,
-    'g': 2.0, 'y': 2.0, 'p': 1.9, 'b': 1.3, 'v': 1.0, 'k': 0.8, 'j': 0.15, 'x': 0.15,
-    'q': 0.10, 'z': 0.07
-}
+from analysis_result import AnalysisResult, Candidate
+from cipher_kernel import apply_key, compile_affine
+from key_scoring import CiphertextStatistics
+from frequency_counter import (
+    analyze_letter_frequency, count_file, count_letters, frequencies_from_counts, read_preview
+)
+from language_profiles import get_profiles, language_frequencies, profile_paths
+from lexicon import Lexicon, build_lexicon, lexicon_path
+from profiler import StageProfiler, active_profiler, record_stage, run_profiled, stage, use_profiler
+from word_patterns import text_words
+from language_model import (
+    build_ngram_table, default_corpus_paths, encode_letters, load_language_model,
+    model_path, read_corpus, score_letter_codes
+)
 
-# Expected letter frequencies in French (percentages)
-FRENCH_FREQ = {
-    'e': 14.7, 'a': 7.6, 'i': 7.5, 't': 7.2, 'n': 7.1, 'r': 6.6, 's': 6.5, 'u': 6.3,
-    'l': 5.5, 'o': 5.4, 'm': 3.0, 'd': 3.7, 'c': 3.3, 'p': 3.0, 'h': 0.9, 'g': 1.1,
-    'b': 0.9, 'v': 1.6, 'j': 0.5, 'f': 1.1, 'q': 1.4, 'z': 0.3, 'x': 0.4, 'w': 0.1,
-    'y': 0.2, 'k': 0.05
-}
+# Progress lines of the analysis methods are printed only in verbose mode;
+# analyze() turns them off so that library callers get no console output.
+# A context variable, so concurrent analyses on other threads keep their own
+_verbose = contextvars.ContextVar('verbose', default=True)
+
+def progress(message):
+    """Print an analysis progress line unless output is quiet."""
+    if _verbose.get():
+        print(message)
+
+@contextlib.contextmanager
+def progress_output(enabled):
+    """Turn progress lines on or off for the enclosed block (in this thread)."""
+    token = _verbose.set(enabled)
+    try:
+        yield
+    finally:
+        _verbose.reset(token)
+
+# Heavy optional dependencies (python-dotenv, google.generativeai, matplotlib)
+# are imported on first use so that plain analysis starts quickly
+_dotenv_loaded = False
+_gemini_configured = False
+genai = None
+
+def load_environment():
+    """Load environment variables from a .env file once, if python-dotenv is installed."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        _dotenv_loaded = True
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+
+def gemini_available():
+    """Import Google Gemini AI on first use and report whether it is installed."""
+    global genai
+    if genai is None:
+        try:
+            import google.generativeai as genai_module
+        except ImportError:
+            return False
+        genai = genai_module
+    return True
+
+# Expected letter frequencies in English and French (percentages), from profiles/
+ENGLISH_FREQ = language_frequencies('english')
+FRENCH_FREQ = language_frequencies('french')
 
 # Common words for language detection
 ENGLISH_WORDS = ['the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'man', 'end', 'few', 'got', 'let', 'put', 'say', 'she', 'too', 'use', 'over', 'quick', 'brown', 'fox', 'jumps', 'lazy', 'dog']
 
 FRENCH_WORDS = ['le', 'de', 'et', 'un', 'il', 'en', 'que', 'pour', 'dans', 'ce', 'son', 'une', 'sur', 'avec', 'ne', 'se', 'pas', 'tout', 'plus', 'par', 'grand', 'comme', 'lui', 'temps', 'sans', 'nous', 'mon', 'bien', 'encore', 'aussi', 'leur', 'dont', 'peu', 'elle', 'fois', 'sous', 'depuis', 'tant', 'toujours', 'entre', 'autre', 'donc', 'vers', 'du', 'au', 'la', 'les', 'des', 'cette', 'ces', 'mes', 'tes', 'ses', 'nos', 'vos', 'leurs', 'qui', 'quoi', 'celui', 'celle', 'ceux', 'celles', 'moi', 'toi', 'soi', 'eux', 'elles', 'si', 'oui', 'non', 'peut', 'doit', 'fait', 'dit', 'va', 'vient', 'sort', 'contre', 'autour', 'devant', 'avant', 'mais', 'car', 'ainsi', 'alors', 'enfin', 'ensuite', 'puis', 'beaucoup', 'assez', 'trop', 'moins', 'autant', 'aussi', 'fort', 'bien', 'mal', 'mieux', 'pire', 'environ', 'presque', 'seulement', 'jamais', 'parfois', 'souvent', 'maintenant', 'hier', 'demain', 'ici', 'ailleurs', 'partout', 'etait', 'claire', 'avril', 'froid', 'rapidement', 'porte', 'vitree', 'maisons', 'victoire', 'sentait', 'vieux', 'tapis']
 
+# Characters of a Caesar candidate checked for common words when choosing its language
+LANGUAGE_SAMPLE_CHARS = 1000
+
+# Multipliers coprime with 26; with the 26 offsets they give the 312 affine keys
+AFFINE_MULTIPLIERS = (1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25)
+AFFINE_KEYS = tuple((multiplier, offset) for multiplier in AFFINE_MULTIPLIERS for offset in range(26))
+
+# Built-in words per language; other languages rely on their lexicons/ word list
+BUILTIN_WORDS = {'english': ENGLISH_WORDS, 'french': FRENCH_WORDS}
+
+@lru_cache(maxsize=None)
+def get_lexicon(language):
+    """Word lexicon for a language or 'all' (every profiled language), built once per process."""
+    if language == 'all':
+        return Lexicon(set().union(*(get_lexicon(name).words for name in get_profiles().names)))
+    return build_lexicon(language, BUILTIN_WORDS.get(language, ()))
+
+# Gemini model and generation settings (also part of the refinement cache key)
+GEMINI_MODEL = 'gemini-2.0-flash'
+GEMINI_GENERATION_CONFIG = {
+    'temperature': 0.1,  # Very low temperature for minimal creativity
+    'max_output_tokens': 2000,
+    'top_p': 0.1,
+    'top_k': 1
+}
+
+# Per-call timeout (seconds) and number of refinements in flight at once
+GEMINI_TIMEOUT = float(os.getenv('LUKIN_AI_TIMEOUT', '30'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('LUKIN_AI_CONCURRENCY', '4'))
+
+# Share of dictionary words at which a parallel strategy's result is accepted
+# without waiting for the others
+DEFAULT_CONFIDENCE = 0.9
+
+# Part of every analysis cache key: bump it when a change can alter analysis results
+SOLVER_VERSION = 1
+
+# Marker stages of a run cut short by a deadline or a failed AI refinement;
+# such results are not cached
+INCOMPLETE_STAGES = ('deadline_stop', 'gemini_timeout', 'gemini_error')
+
 # Gemini AI Configuration
 def configure_gemini():
-    """Configure Gemini AI with the API key from environment variables."""
-    if not GEMINI_AVAILABLE:
+    """Configure Gemini AI with the API key from environment variables (once per process)."""
+    global _gemini_configured
+    if _gemini_configured:
+        return True
+    if not gemini_available():
         return False
     
+    load_environment()
     try:
         # Try to get API key from environment variable
         api_key = os.getenv('GEMINI_API_KEY')
         
         if not api_key:
-            print("⚠️  Warning: GEMINI_API_KEY not found in environment variables")
-            print("    Create a .env file with: GEMINI_API_KEY=your_api_key_here")
+            progress("⚠️  Warning: GEMINI_API_KEY not found in environment variables")
+            progress("    Create a .env file with: GEMINI_API_KEY=your_api_key_here")
             return False
         
-        genai.configure(api_key=api_key)
+        # GEMINI_API_ENDPOINT points the client at another server, e.g. a local stub
+        endpoint = os.getenv('GEMINI_API_ENDPOINT')
+        if endpoint:
+            genai.configure(api_key=api_key, transport='rest', client_options={'api_endpoint': endpoint})
+        else:
+            genai.configure(api_key=api_key)
+        _gemini_configured = True
         return True
     except Exception as e:
-        print(f"⚠️  Warning: Could not configure Gemini AI: {e}")
+        progress(f"⚠️  Warning: Could not configure Gemini AI: {e}")
         return False
 
-def analyze_letter_frequency(text):
-    """Analyze the frequency of each letter in the given text."""
-    letters_only = ''.join(char.lower() for char in text if char.isalpha())
-    letter_counts = Counter(letters_only)
-    total_letters = len(letters_only)
-    
-    frequencies = {}
-    for letter in string.ascii_lowercase:
-        count = letter_counts.get(letter, 0)
-        percentage = (count / total_letters * 100) if total_letters > 0 else 0
-        frequencies[letter] = {'count': count, 'percentage': percentage}
-    
-    return frequencies, total_letters
-
 def caesar_decrypt(text, shift):
     """Decrypt text using Caesar cipher with given shift."""
-    result = ""
-    for char in text:
-        if char.isalpha():
-            base = ord('A') if char.isupper() else ord('a')
-            shifted = (ord(char) - base - shift) % 26
-            result += chr(shifted + base)
-        else:
-            result += char
-    return result
+    return apply_key(text, shift)
+
+def affine_decrypt(text, multiplier, offset):
+    """Decrypt text using an affine cipher key (cipher letter = multiplier * plain + offset)."""
+    return apply_key(text, compile_affine(multiplier, offset))
 
-def calculate_language_score(text, language_freq):
-    """Calculate how similar the letter frequencies are to a specific language."""
+def calculate_language_score(text, language_freq, ngram_model=None):
+    """Calculate how similar the letter frequencies are to a specific language.
+    
+    With an n-gram model the score is the text's total log10 probability under
+    it instead; the two scales are not comparable with each other.
+    """
+    if ngram_model is not None:
+        letter_codes = encode_letters(text)
+        if not letter_codes:
+            return -float('inf')
+        ngram_size = max(ngram_model.tables)
+        return score_letter_codes(ngram_model.tables[ngram_size], letter_codes, ngram_size)
+    
     frequencies, total = analyze_letter_frequency(text)
-    if total == 0:
+    return frequency_score(frequencies, total, language_freq)
+
+def frequency_score(frequencies, total_letters, language_freq):
+    """Score already-computed letter frequencies against a language's expected frequencies."""
+    if total_letters == 0:
         return -float('inf')
     
     score = 0
@@ -116,74 +203,99 @@ def calculate_language_score(text, language_freq):
     return score
 
 def detect_language(text):
-    """Detect if text is more likely English or French."""
-    english_score = calculate_language_score(text, ENGLISH_FREQ)
-    french_score = calculate_language_score(text, FRENCH_FREQ)
+    """Detect the most likely of the profiled languages, returning (language, frequencies, words)."""
+    profiles = get_profiles()
     
-    # Also check for common words
+    # Combine frequency score with common word count (earlier languages win ties)
     text_lower = text.lower()
-    english_word_count = sum(1 for word in ENGLISH_WORDS if word in text_lower)
-    french_word_count = sum(1 for word in FRENCH_WORDS if word in text_lower)
+    words = [get_lexicon(language).count_present(text_lower) * 10 for language in profiles.names]
+    totals = [score + bonus for score, bonus in zip(profiles.scores(*count_letters(text)), words)]
+    best = max(range(len(totals)), key=totals.__getitem__)
     
-    # Combine frequency score with word count
-    english_total = english_score + (english_word_count * 10)
-    french_total = french_score + (french_word_count * 10)
+    # The n-gram models settle the choice among the languages that have one
+    # (the two scales do not mix, so they only rank those languages)
+    models = {index: load_language_model(language) for index, language in enumerate(profiles.names)}
+    models = {index: model for index, model in models.items() if model is not None}
+    if len(models) > 1 and best in models:
+        ngram_totals = {index: calculate_language_score(text, None, model) + words[index]
+                        for index, model in models.items()}
+        best = max(models, key=ngram_totals.__getitem__)
     
-    if french_total > english_total:
-        return 'french', FRENCH_FREQ, FRENCH_WORDS
-    else:
-        return 'english', ENGLISH_FREQ, ENGLISH_WORDS
+    language = profiles.names[best]
+    return language, profiles.frequencies(language), BUILTIN_WORDS.get(language, [])
 
 def try_all_caesar_shifts(ciphertext):
     """Try all possible Caesar cipher shifts and return the best result."""
-    best_results = {'english': None, 'french': None}
-    best_scores = {'english': -float('inf'), 'french': -float('inf')}
+    letter_counts, total_letters = count_letters(ciphertext)
+    if total_letters == 0:
+        return None
     
-    for shift in range(26):
-        decrypted = caesar_decrypt(ciphertext, shift)
-        
-        # Test against both languages
-        english_score = calculate_language_score(decrypted, ENGLISH_FREQ)
-        french_score = calculate_language_score(decrypted, FRENCH_FREQ)
-        
-        if english_score > best_scores['english']:
-            best_scores['english'] = english_score
-            best_results['english'] = {
-                'shift': shift,
-                'text': decrypted,
-                'score': english_score,
-                'method': 'Caesar Cipher (English)',
-                'language': 'english'
-            }
-        
-        if french_score > best_scores['french']:
-            best_scores['french'] = french_score
-            best_results['french'] = {
-                'shift': shift,
-                'text': decrypted,
-                'score': french_score,
-                'method': 'Caesar Cipher (French)',
-                'language': 'french'
-            }
-    
-    # Return the best overall result
-    if best_scores['french'] > best_scores['english']:
-        return best_results['french']
-    else:
-        return best_results['english']
+    # Every shift against every language from the one count vector
+    scores = get_profiles().shift_scores(letter_counts, total_letters)
+    lang, shift, score = best_language_key(ciphertext, scores, range(26), caesar_decrypt)
+    
+    # Decrypt only the winning shift
+    return {
+        'shift': shift,
+        'text': caesar_decrypt(ciphertext, shift),
+        'score': score,
+        'method': f'Caesar Cipher ({lang.title()})',
+        'language': lang
+    }
 
-def gemini_text_refiner(partially_decoded_text, original_cipher, method_name, language='auto'):
-    """Use Gemini AI to refine and fix remaining issues in partially decoded text."""
-    if not configure_gemini():
+def best_language_key(ciphertext, scores, keys, decrypt):
+    """Pick the language and key from per-language key scores, returning (language, key, score).
+    
+    Letter frequencies of short texts fit several languages about equally well;
+    the dictionary words of each language's best key, read from a decrypted
+    prefix, settle it. A key whose words are mostly dictionary words beats
+    any that are not, so a language without a word list cannot win on its
+    letter profile alone. decrypt(text, key) decrypts with one of keys.
+    """
+    profiles = get_profiles()
+    best_keys = [max(range(len(keys)), key=row.__getitem__) for row in scores]
+    
+    sample = ciphertext[:LANGUAGE_SAMPLE_CHARS]
+    words = {index: text_words(decrypt(sample, keys[index])) for index in set(best_keys)}
+    hits = [get_dictionary(language).count_tokens(words[index]) for language, index in zip(profiles.names, best_keys)]
+    readable = [len(words[index]) > 0 and count * 2 >= len(words[index]) for count, index in zip(hits, best_keys)]
+    totals = [row[index] + count * 10 for row, index, count in zip(scores, best_keys, hits)]
+    language = max(range(len(profiles)), key=lambda language: (readable[language], totals[language]))
+    index = best_keys[language]
+    return profiles.names[language], keys[index], scores[language][index]
+
+@lru_cache(maxsize=None)
+def affine_permutations():
+    """For each of AFFINE_KEYS, the cipher letter of every plain letter (multiplier * i + offset)."""
+    return tuple([(multiplier * index + offset) % 26 for index in range(26)] for multiplier, offset in AFFINE_KEYS)
+
+def try_all_affine_keys(ciphertext):
+    """Try all 312 affine keys and return the best result, or None when it is a plain shift.
+    
+    Keys are scored by rearranging the one letter count vector against the
+    language profiles; only the winning key decrypts the text.
+    """
+    letter_counts, total_letters = count_letters(ciphertext)
+    if total_letters == 0:
         return None
     
-    print("    🤖 Gemini AI refinement...")
+    scores = get_profiles().permutation_scores(letter_counts, total_letters, affine_permutations())
+    lang, (multiplier, offset), score = best_language_key(
+        ciphertext, scores, AFFINE_KEYS, lambda text, key: affine_decrypt(text, *key))
+    if multiplier == 1:
+        return None  # the Caesar sweep reports shifts
     
-    try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Create a refined prompt for minimal correction
-        prompt = f"""You are a proofreader fixing ONLY obvious letter substitution errors in a partially decoded cipher.
+    return {
+        'affine_key': (multiplier, offset),
+        'text': affine_decrypt(ciphertext, multiplier, offset),
+        'score': score,
+        'method': f'Affine Cipher ({lang.title()})',
+        'language': lang
+    }
+
+def build_refinement_prompt(partially_decoded_text, language):
+    """Create a refined prompt for minimal correction."""
+    return f"""You are a proofreader fixing ONLY obvious letter substitution errors in a partially decoded cipher.
 
 PARTIALLY DECODED TEXT: "{partially_decoded_text}"
 TARGET LANGUAGE: {language}
@@ -212,75 +324,213 @@ Provide ONLY the minimally corrected text:
 
 CORRECTED:"""
 
-        # Use low temperature to prevent hallucination
-        generation_config = genai.types.GenerationConfig(
-            temperature=0.1,  # Very low temperature for minimal creativity
-            max_output_tokens=2000,
-            top_p=0.1,
-            top_k=1
-        )
-        
-        response = model.generate_content(prompt, generation_config=generation_config)
+def clean_refined_text(response_text):
+    """Strip the labels and quotes Gemini sometimes wraps around its answer."""
+    refined_text = response_text.strip()
+    
+    # Remove any potential formatting or extra text
+    if refined_text.startswith('CORRECTED:'):
+        refined_text = refined_text.replace('CORRECTED:', '').strip()
+    elif refined_text.startswith('CORRECTED TEXT:'):
+        refined_text = refined_text.replace('CORRECTED TEXT:', '').strip()
+    
+    # Remove quotes if the AI added them
+    if refined_text.startswith('"') and refined_text.endswith('"'):
+        refined_text = refined_text[1:-1]
+    
+    return refined_text
+
+def refinement_result(partially_decoded_text, refined_text, method_name, language):
+    """Score an AI refinement against the text it came from, or return None if nothing changed."""
+    if not refined_text or refined_text == partially_decoded_text:
+        return None
+    
+    # Calculate improvement score
+    original_score = calculate_language_score(partially_decoded_text, language_frequencies(language))
+    refined_score = calculate_language_score(refined_text, language_frequencies(language))
+    
+    # Count readable words improvement
+    original_words = count_readable_words(partially_decoded_text, language)
+    refined_words = count_readable_words(refined_text, language)
+    
+    progress(f"    AI refinement preview: {refined_text[:60]}...")
+    progress(f"    Readability improvement: {original_words} → {refined_words} readable words")
+    
+    return {
+        'text': refined_text,
+        'original_text': partially_decoded_text,
+        'improvement_score': refined_score - original_score,
+        'readable_words_before': original_words,
+        'readable_words_after': refined_words,
+        'method': f'{method_name} + AI Refinement'
+    }
+
+def ai_offline_mode():
+    """True when AI refinement must only be served from the cache (LUKIN_AI_OFFLINE=1)."""
+    return os.getenv('LUKIN_AI_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+def ai_refinement_available():
+    """AI refinement needs Gemini installed, unless it is served from the cache only."""
+    load_environment()
+    return ai_offline_mode() or gemini_available()
+
+@lru_cache(maxsize=None)
+def get_refinement_cache():
+    """On-disk cache of Gemini refinements (TTL from LUKIN_AI_CACHE_TTL_DAYS, default 30 days)."""
+    from disk_cache import DiskCache
+    
+    ttl_days = float(os.getenv('LUKIN_AI_CACHE_TTL_DAYS', '30'))
+    return DiskCache('gemini-refinements', max_entries=5000, ttl=ttl_days * 86400 if ttl_days > 0 else None)
+
+@lru_cache(maxsize=None)
+def get_analysis_cache():
+    """On-disk cache of analysis results (size limits from LUKIN_ANALYSIS_CACHE_MB and _ENTRIES)."""
+    from analysis_cache import AnalysisCache
+    
+    return AnalysisCache()
+
+@lru_cache(maxsize=None)
+def solver_data_fingerprint():
+    """files_fingerprint() of the profiles, lexicons, n-gram models and corpora, taken once per process.
+    
+    Taken once, like the data itself is loaded once, so a file changed while
+    a server runs does not key the results of the data it still uses.
+    """
+    from analysis_cache import files_fingerprint
+    
+    languages = profile_paths()
+    paths = list(languages.values())
+    for language in languages:
+        paths += [lexicon_path(language), model_path(language)] + default_corpus_paths(language)
+    return files_fingerprint(paths)
+
+def gemini_text_refiner(partially_decoded_text, original_cipher, method_name, language='auto'):
+    """Use Gemini AI to refine and fix remaining issues in partially decoded text."""
+    return refine_candidates([{'text': partially_decoded_text, 'method': method_name, 'language': language}],
+                             original_cipher)[0]
+
+def refine_candidates(candidates, original_cipher, timeout=None, max_concurrency=None):
+    """Refine several candidate results with Gemini concurrently, returning one refinement (or None) each.
+    
+    All uncached requests are in flight together, so the wall-clock cost is
+    about one round-trip however many candidates there are.
+    """
+    import asyncio
+    
+    return asyncio.run(_refine_candidates_async(
+        candidates, original_cipher,
+        timeout if timeout is not None else GEMINI_TIMEOUT,
+        max_concurrency or GEMINI_MAX_CONCURRENCY
+    ))
+
+async def _refine_candidates_async(candidates, original_cipher, timeout, max_concurrency):
+    """Run one refinement task per candidate under a shared concurrency limit."""
+    import asyncio
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # A private executor so timed-out calls are not waited for when the loop closes
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        return await asyncio.gather(*[
+            _gemini_refine_async(candidate['text'], original_cipher, candidate['method'],
+                                 candidate.get('language', 'auto'), semaphore, executor, timeout)
+            for candidate in candidates
+        ])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _generate_refinement(prompt, timeout):
+    """Blocking Gemini call returning the cleaned answer text, or None."""
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    generation_config = genai.types.GenerationConfig(**GEMINI_GENERATION_CONFIG)
+    response = model.generate_content(prompt, generation_config=generation_config,
+                                      request_options={'timeout': timeout})
+    if response and response.text:
+        return clean_refined_text(response.text)
+    return None
+
+async def _gemini_refine_async(partially_decoded_text, original_cipher, method_name, language, semaphore, executor, timeout):
+    """Refine one text: from the cache if possible, otherwise with a timed Gemini call."""
+    import asyncio
+    import sqlite3
+    
+    from disk_cache import make_cache_key
+    
+    load_environment()
+    cache = get_refinement_cache()
+    cache_key = make_cache_key(partially_decoded_text, language, GEMINI_MODEL, GEMINI_GENERATION_CONFIG)
+    
+    # Identical requests are answered from the cache without a network call
+    try:
+        refined_text = cache.get(cache_key)
+    except (sqlite3.Error, OSError) as e:
+        progress(f"    ⚠️  AI refinement cache unavailable: {e}")
+        refined_text = None
+    if refined_text is not None:
+        record_stage('gemini_cached', 0.0)
+        progress("    🤖 Gemini AI refinement (cached)...")
+        return refinement_result(partially_decoded_text, refined_text, method_name, language)
+    
+    if ai_offline_mode():
+        progress("    📴 No cached AI refinement (offline mode)")
+        return None
+    
+    if not configure_gemini():
+        return None
+    
+    progress("    🤖 Gemini AI refinement...")
+    
+    try:
+        prompt = build_refinement_prompt(partially_decoded_text, language)
+        async with semaphore:
+            # The client call blocks, so it runs in a worker thread
+            loop = asyncio.get_running_loop()
+            request_started = time.perf_counter()
+            try:
+                refined_text = await asyncio.wait_for(
+                    loop.run_in_executor(executor, _generate_refinement, prompt, timeout), timeout
+                )
+            finally:
+                record_stage('gemini_request', time.perf_counter() - request_started)
         
-        if response and response.text:
-            refined_text = response.text.strip()
-            
-            # Remove any potential formatting or extra text
-            if refined_text.startswith('CORRECTED:'):
-                refined_text = refined_text.replace('CORRECTED:', '').strip()
-            elif refined_text.startswith('CORRECTED TEXT:'):
-                refined_text = refined_text.replace('CORRECTED TEXT:', '').strip()
-            
-            # Remove quotes if the AI added them
-            if refined_text.startswith('"') and refined_text.endswith('"'):
-                refined_text = refined_text[1:-1]
-            
-            if refined_text and refined_text != partially_decoded_text:
-                # Calculate improvement score
-                original_score = calculate_language_score(partially_decoded_text, FRENCH_FREQ if language == 'french' else ENGLISH_FREQ)
-                refined_score = calculate_language_score(refined_text, FRENCH_FREQ if language == 'french' else ENGLISH_FREQ)
-                
-                # Count readable words improvement
-                original_words = count_readable_words(partially_decoded_text, language)
-                refined_words = count_readable_words(refined_text, language)
-                
-                print(f"    AI refinement preview: {refined_text[:60]}...")
-                print(f"    Readability improvement: {original_words} → {refined_words} readable words")
-                
-                return {
-                    'text': refined_text,
-                    'original_text': partially_decoded_text,
-                    'improvement_score': refined_score - original_score,
-                    'readable_words_before': original_words,
-                    'readable_words_after': refined_words,
-                    'method': f'{method_name} + AI Refinement'
-                }
+        if refined_text:
+            try:
+                cache.set(cache_key, refined_text)
+            except (sqlite3.Error, OSError) as e:
+                progress(f"    ⚠️  Could not cache AI refinement: {e}")
+            return refinement_result(partially_decoded_text, refined_text, method_name, language)
         
+    except asyncio.TimeoutError:
+        record_stage('gemini_timeout', 0.0)
+        progress(f"    ⚠️  Gemini AI refinement timed out after {timeout:g}s")
     except Exception as e:
-        print(f"    ⚠️  Gemini AI refinement error: {e}")
+        record_stage('gemini_error', 0.0)
+        progress(f"    ⚠️  Gemini AI refinement error: {e}")
     
     return None
 
 def count_readable_words(text, language):
     """Count readable words in the given language."""
     words = text.lower().split()
-    word_list = FRENCH_WORDS if language == 'french' else ENGLISH_WORDS
+    lexicon = get_lexicon('french' if language == 'french' else 'english')
     readable_count = 0
     
-    for word in words:
+    for word, count in Counter(words).items():
         # Remove punctuation
         clean_word = ''.join(c for c in word if c.isalpha())
         if len(clean_word) >= 2:
-            if clean_word in word_list:
-                readable_count += 1
+            if clean_word in lexicon:
+                readable_count += count
             elif len(clean_word) <= 3:  # Short words are often readable
-                readable_count += 0.5
+                readable_count += 0.5 * count
     
     return int(readable_count)
 
-def expert_manual_analysis(ciphertext):
+def expert_manual_analysis(ciphertext, stats=None):
     """Expert manual analysis based on successful pattern analysis."""
-    print("    🎯 Expert manual analysis...")
+    progress("    🎯 Expert manual analysis...")
     
     # Proven mapping from successful manual decoding
     expert_mapping = {
@@ -312,135 +562,264 @@ def expert_manual_analysis(ciphertext):
         'i': 'j',   # appears correct
     }
     
-    result = apply_substitution(ciphertext, expert_mapping)
-    
-    # Calculate a high score for this expert analysis
-    base_score = calculate_language_score(result, FRENCH_FREQ)
-    word_bonus = count_french_words(result) * 200  # Higher bonus for expert method
+    # Calculate a high score for this expert analysis, from the ciphertext's counts
+    stats = stats or CiphertextStatistics(ciphertext)
+    base_score = stats.frequency_score(expert_mapping, FRENCH_FREQ)
+    word_bonus = stats.word_count(expert_mapping, get_lexicon('french'), short_length=2) * 200  # Higher bonus for expert method
     final_score = base_score + word_bonus
     
-    print(f"    Expert result preview: {result[:60]}...")
+    progress(f"    Expert result preview: {apply_substitution(ciphertext[:60], expert_mapping)}...")
     
     return {
-        'text': result,
         'score': final_score,
         'mapping': expert_mapping,
         'method': 'Expert Manual Analysis',
         'language': 'french'
     }
 
-def frequency_substitution_analysis(ciphertext, use_ai=False):
-    """Enhanced substitution cipher analysis with expert method and AI refinement."""
-    print("🔬 Advanced substitution analysis...")
+@lru_cache(maxsize=None)
+def _corpus_ngram_table(language, ngram_size):
+    """Build (once per process) an n-gram table straight from the bundled corpus files."""
+    return build_ngram_table(read_corpus(default_corpus_paths(language)), ngram_size)
+
+def load_ngram_table(language, ngram_size=3):
+    """N-gram table for a language, from the memory-mapped model if built, else from the corpus."""
+    model = load_language_model(language)
+    if model and ngram_size in model.tables:
+        return model.tables[ngram_size]
+    return _corpus_ngram_table(language, ngram_size)
+
+@lru_cache(maxsize=None)
+def dictionary_words(language):
+    """The lexicon words followed by every word of the language's corpus, repeats included, read once per process."""
+    from word_patterns import read_text_words
+    
+    return tuple(get_lexicon(language).words) + tuple(read_text_words(default_corpus_paths(language)))
+
+@lru_cache(maxsize=None)
+def get_pattern_index(language):
+    """Word pattern index over the lexicon and the corpus vocabulary, built once per process."""
+    from word_patterns import build_pattern_index
+    
+    # Corpus occurrences rank the candidates of each pattern by frequency
+    return build_pattern_index(dictionary_words(language))
+
+@lru_cache(maxsize=None)
+def get_dictionary(language):
+    """The words of the word pattern index as a lexicon, without building the index."""
+    return Lexicon(word for word in set(dictionary_words(language))
+                   if word.isascii() and word.isalpha() and len(word) <= 26)
+
+def count_dictionary_words(text, language):
+    """Number of words in text found in the language's dictionary (lexicon plus corpus vocabulary)."""
+    return get_dictionary(language).count_tokens(text_words(text))
+
+def word_pattern_substitution(ciphertext, language='english', max_nodes=1000, stats=None):
+    """Derive a substitution key from the dictionary words that fit the cipher's word patterns."""
+    from word_patterns import solve_word_patterns
+    
+    mapping, matched = solve_word_patterns(ciphertext, get_pattern_index(language), max_nodes=max_nodes)
+    if not matched:
+        return None
+    
+    # Letters no matched word covers fall back to frequency order
+    stats = stats or CiphertextStatistics(ciphertext)
+    language_freq = language_frequencies(language)
+    letter_counts = stats.letter_counts
+    free_plain = [letter for letter, _ in sorted(language_freq.items(), key=lambda x: x[1], reverse=True)
+                  if letter not in mapping.values()]
+    cipher_rank = sorted(range(26), key=lambda code: letter_counts[code], reverse=True)
+    unmapped = [string.ascii_lowercase[code] for code in cipher_rank
+                if letter_counts[code] > 0 and string.ascii_lowercase[code] not in mapping]
+    mapping.update(zip(unmapped, free_plain))
+    
+    word_count = stats.word_count(mapping, get_lexicon(language), short_length=2)
+    
+    return {
+        # Dictionary-confirmed words weigh as much as in the expert analysis
+        'score': stats.frequency_score(mapping, language_freq) + word_count * 200,
+        'mapping': mapping,
+        'matched_words': len(matched),
+        'method': f'Word Pattern Analysis ({language.title()})',
+        'language': language
+    }
+
+def hill_climb_substitution(ciphertext, language='english', restarts=10, ngram_size=None, seed=None, stats=None,
+                            workers=1):
+    """Search for a substitution key with random-restart hill-climbing on n-gram log-probabilities.
+    
+    With workers > 1 the restarts run on a process pool (see key_search).
+    """
+    from key_search import search_keys
+    
+    if ngram_size is None:
+        # Quadgrams need the large corpus behind a built model; trigrams otherwise
+        model = load_language_model(language)
+        ngram_size = max(model.tables) if model else 3
+    
+    stats = stats or CiphertextStatistics(ciphertext)
+    letter_codes = stats.letter_codes
+    if len(letter_codes) < ngram_size:
+        return None
+    
+    language_freq = language_frequencies(language)
+    ngram_table = load_ngram_table(language, ngram_size)
+    ngrams, counts = stats.ngram_counts(ngram_size)
+    
+    # First climb starts from the frequency-rank key
+    cipher_rank = sorted(range(26), key=lambda code: letter_codes.count(code), reverse=True)
+    plain_rank = [ord(letter) - ord('a') for letter, _ in sorted(language_freq.items(), key=lambda x: x[1], reverse=True)]
+    rank_key = [0] * 26
+    for cipher_code, plain_code in zip(cipher_rank, plain_rank):
+        rank_key[cipher_code] = plain_code
+    
+    best_key, best_fitness = search_keys(ngrams, counts, ngram_table, rank_key, restarts, seed, workers)
+    
+    mapping = {string.ascii_lowercase[cipher_code]: string.ascii_lowercase[plain_code]
+               for cipher_code, plain_code in enumerate(best_key)}
+    word_count = stats.word_count(mapping, get_lexicon(language), short_length=2)
+    
+    return {
+        'score': stats.frequency_score(mapping, language_freq) + word_count * 20,
+        'fitness': best_fitness,
+        'mapping': mapping,
+        'method': f'Hill-Climbing Search ({language.title()})',
+        'language': language
+    }
+
+def frequency_substitution_analysis(ciphertext, use_ai=False, search=False, restarts=10, search_workers=1):
+    """Enhanced substitution cipher analysis with expert method and AI refinement.
+    
+    search_workers > 1 runs the --search restarts on a process pool.
+    """
+    stats = CiphertextStatistics(ciphertext)
+    results = substitution_candidates(ciphertext, stats)
+    
+    # Refine the expert, frequency and word pattern results with Gemini, all at once
+    if use_ai and ai_refinement_available():
+        results += refine_substitution_results(results, ciphertext)
+    
+    # Search for the key itself instead of relying on fixed mappings
+    if search:
+        for lang in ['english', 'french']:
+            progress(f"    🧗 Hill-climbing key search ({lang.title()}, {restarts} restarts)...")
+            with stage(f'hill_climb_{lang}'):
+                search_result = hill_climb_substitution(ciphertext, lang, restarts=restarts, stats=stats,
+                                                        workers=search_workers)
+            if search_result:
+                results.append(search_result)
+    
+    return best_substitution_result(results, ciphertext)
+
+def substitution_candidates(ciphertext, stats=None):
+    """Expert, frequency-rank and word pattern candidates for a substitution cipher.
+    
+    Candidates are scored from the ciphertext's count tables and carry their
+    key but no plaintext; decrypt_result() adds it to the ones reported.
+    """
+    progress("🔬 Advanced substitution analysis...")
     
     results = []
+    with stage('letter_frequency'):
+        stats = stats or CiphertextStatistics(ciphertext)
     
     # Try expert manual analysis for known patterns
-    expert_result = expert_manual_analysis(ciphertext)
+    with stage('expert'):
+        expert_result = expert_manual_analysis(ciphertext, stats)
     if expert_result:
         results.append(expert_result)
-        
-        # Try AI refinement on expert result if enabled
-        if use_ai and GEMINI_AVAILABLE:
-            refined_expert = gemini_text_refiner(
-                expert_result['text'], 
-                ciphertext, 
-                expert_result['method'], 
-                expert_result['language']
-            )
-            if refined_expert and refined_expert['improvement_score'] > 0:
-                # Create a new result with improved score
-                refined_result = expert_result.copy()
-                refined_result['text'] = refined_expert['text']
-                refined_result['score'] += refined_expert['improvement_score'] + (refined_expert['readable_words_after'] * 50)
-                refined_result['method'] = refined_expert['method']
-                refined_result['ai_refined'] = True
-                results.append(refined_result)
     
     # Try basic frequency analysis for comparison
-    frequencies, total = analyze_letter_frequency(ciphertext)
+    frequencies = frequencies_from_counts(stats.letter_counts, stats.total_letters)
     cipher_sorted = sorted(frequencies.items(), key=lambda x: x[1]['percentage'], reverse=True)
     
     # Try both English and French frequency mappings
     for lang, freq_data in [('english', ENGLISH_FREQ), ('french', FRENCH_FREQ)]:
-        lang_sorted = sorted(freq_data.items(), key=lambda x: x[1], reverse=True)
-        
-        substitution = {}
-        for i, (cipher_letter, _) in enumerate(cipher_sorted):
-            if i < len(lang_sorted) and frequencies[cipher_letter]['count'] > 0:
-                substitution[cipher_letter] = lang_sorted[i][0]
-        
-        freq_result = apply_substitution(ciphertext, substitution)
-        word_count = count_french_words(freq_result) if lang == 'french' else count_english_words(freq_result)
-        freq_score = calculate_language_score(freq_result, freq_data) + word_count * 20
+        with stage(f'frequency_{lang}'):
+            lang_sorted = sorted(freq_data.items(), key=lambda x: x[1], reverse=True)
+            
+            substitution = {}
+            for i, (cipher_letter, _) in enumerate(cipher_sorted):
+                if i < len(lang_sorted) and frequencies[cipher_letter]['count'] > 0:
+                    substitution[cipher_letter] = lang_sorted[i][0]
+            
+            word_count = stats.word_count(substitution, get_lexicon(lang), short_length=2)
+            freq_score = stats.frequency_score(substitution, freq_data) + word_count * 20
         
         freq_analysis = {
-            'text': freq_result,
             'score': freq_score,
             'mapping': substitution,
             'method': f'Frequency Analysis ({lang.title()})',
             'language': lang
         }
         results.append(freq_analysis)
-        
-        # Try AI refinement on frequency analysis if enabled
-        if use_ai and GEMINI_AVAILABLE:
-            refined_freq = gemini_text_refiner(
-                freq_result, 
-                ciphertext, 
-                f'Frequency Analysis ({lang.title()})', 
-                lang
-            )
-            if refined_freq and refined_freq['improvement_score'] > 0:
-                # Create a new result with improved score
-                refined_result = freq_analysis.copy()
-                refined_result['text'] = refined_freq['text']
-                refined_result['score'] += refined_freq['improvement_score'] + (refined_freq['readable_words_after'] * 50)
-                refined_result['method'] = refined_freq['method']
-                refined_result['ai_refined'] = True
-                results.append(refined_result)
-    
-    # Return the best result
-    best_result = max(results, key=lambda x: x['score'])
+    
+    # Solve for the key from word patterns when the ciphertext keeps its word breaks
+    for lang in ['english', 'french']:
+        with stage(f'word_pattern_{lang}'):
+            pattern_result = word_pattern_substitution(ciphertext, lang, stats=stats)
+        if pattern_result:
+            progress(f"    🧩 Word pattern analysis ({lang.title()}): {pattern_result['matched_words']} words matched")
+            results.append(pattern_result)
+    
+    return results
+
+def refine_substitution_results(results, ciphertext, timeout=None):
+    """Refine candidate results with Gemini, returning new results for the ones it improved."""
+    # Gemini reads the plaintext of every candidate
+    for result in results:
+        decrypt_result(result, ciphertext)
+    with stage('ai_refinement'):
+        refinements = refine_candidates(results, ciphertext, timeout=timeout)
+    
+    refined_results = []
+    for candidate, refined in zip(results, refinements):
+        if refined and refined['improvement_score'] > 0:
+            # A new result with the refined text, the same key and an improved score
+            refined_results.append({
+                'text': refined['text'],
+                'score': candidate['score'] + refined['improvement_score'] + (refined['readable_words_after'] * 50),
+                'mapping': candidate['mapping'],
+                'method': refined['method'],
+                'language': candidate['language'],
+                'ai_refined': True
+            })
+    return refined_results
+
+def decrypt_result(result, ciphertext):
+    """Add the plaintext to a result that was scored from its key alone, and return it."""
+    if 'text' not in result:
+        result['text'] = apply_substitution(ciphertext, result['mapping'])
+    return result
+
+def best_substitution_result(results, ciphertext):
+    """Pick and announce the highest-scoring substitution result, decrypting only that one."""
+    best_result = decrypt_result(max(results, key=lambda x: x['score']), ciphertext)
     ai_note = " (AI-refined)" if best_result.get('ai_refined') else ""
-    print(f"  ✓ {best_result['method']}{ai_note} wins with score: {best_result['score']:.1f}")
+    progress(f"  ✓ {best_result['method']}{ai_note} wins with score: {best_result['score']:.1f}")
     
     return best_result
 
 def count_french_words(text):
     """Count recognizable French words in text."""
-    words = text.lower().split()
-    count = 0
-    for word in words:
-        if word in FRENCH_WORDS or len(word) <= 2:
-            count += 1
-    return count
+    return get_lexicon('french').count_tokens(text.lower().split(), short_length=2)
 
 def count_english_words(text):
     """Count recognizable English words in text."""
-    words = text.lower().split()
-    count = 0
-    for word in words:
-        if word in ENGLISH_WORDS or len(word) <= 2:
-            count += 1
-    return count
+    return get_lexicon('english').count_tokens(text.lower().split(), short_length=2)
 
 def apply_substitution(text, substitution):
     """Apply substitution mapping to text."""
-    result = ""
-    for char in text:
-        if char.lower() in substitution:
-            new_char = substitution[char.lower()]
-            if isinstance(new_char, str):
-                result += new_char.upper() if char.isupper() else new_char
-            else:
-                result += char
-        else:
-            result += char
-    return result
+    return apply_key(text, substitution)
 
 def create_frequency_graph(frequencies, title="Letter Frequency Analysis"):
     """Create a simple frequency bar graph."""
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️  Graph skipped: matplotlib is not installed")
+        return
+    
     letters = list(string.ascii_lowercase)
     counts = [frequencies[letter]['count'] for letter in letters]
     
@@ -461,8 +840,17 @@ def create_frequency_graph(frequencies, title="Letter Frequency Analysis"):
     plt.tight_layout()
     plt.show()
 
-def is_likely_encrypted(text):
-    """Determine if text is likely encrypted based on frequency analysis and readability."""
+def is_likely_encrypted(text, triage=False):
+    """Determine if text is likely encrypted based on frequency analysis and readability.
+    
+    With triage, only sampled windows of the text are checked, stopping once
+    the answer is statistically settled (see encryption_triage).
+    """
+    if triage:
+        from encryption_triage import triage_text
+        
+        return triage_text(text, get_lexicon('all'))['encrypted']
+    
     frequencies, total = analyze_letter_frequency(text)
     if total < 10:  # Too short to analyze
         return False
@@ -482,12 +870,7 @@ def is_likely_encrypted(text):
     
     # Check for readable words in both languages
     words = text.lower().split()
-    readable_words = 0
-    all_common_words = set(ENGLISH_WORDS + FRENCH_WORDS)
-    
-    for word in words:
-        if word in all_common_words or len(word) <= 2:
-            readable_words += 1
+    readable_words = get_lexicon('all').count_tokens(words, short_length=2)
     
     # If most words are unreadable and frequency patterns are off, likely encrypted
     readability_score = readable_words / len(words) if len(words) > 0 else 1
@@ -495,19 +878,336 @@ def is_likely_encrypted(text):
     # More sensitive detection: if few words are readable OR frequency is unusual
     return frequency_score >= 1 or readability_score < 0.5
 
-def analyze_text(text, show_graph=False, use_ai=False):
-    """Main analysis function that determines the best translation."""
+def decrypt_text(text, use_ai=False, search=False, restarts=10, parallel=False, deadline=None,
+                 confidence=DEFAULT_CONFIDENCE, search_workers=1):
+    """Run the Caesar, affine, substitution and Vigenère attacks and return (best_result, alternative).
+    
+    With parallel (or a deadline) the attacks run side by side in worker
+    processes; see decrypt_text_parallel. Otherwise search_workers > 1 spreads
+    the key search restarts over that many processes (a strategy worker
+    cannot start a pool of its own).
+    """
+    if parallel or deadline is not None:
+        return decrypt_text_parallel(text, use_ai=use_ai, search=search, restarts=restarts,
+                                     deadline=deadline, confidence=confidence)
+    
+    # Try Caesar cipher
+    with stage('caesar'):
+        caesar_result = try_all_caesar_shifts(text)
+    
+    # Try affine cipher
+    with stage('affine'):
+        affine_result = try_all_affine_keys(text)
+    
+    shift_result = choose_shift_or_affine(caesar_result, affine_result)
+    
+    # Try substitution cipher with expert analysis
+    with stage('substitution'):
+        substitution_result = frequency_substitution_analysis(text, use_ai=use_ai, search=search, restarts=restarts,
+                                                              search_workers=search_workers)
+    
+    # Try Vigenère cipher when the text's statistics point to a polyalphabetic key
+    with stage('vigenere'):
+        vigenere_result = vigenere_analysis(text)
+    
+    return choose_polyalphabetic(vigenere_result, *choose_best_result(shift_result, substitution_result))
+
+def choose_shift_or_affine(caesar_result, affine_result):
+    """The Caesar winner, unless the affine winner reads better."""
+    if caesar_result is None or affine_result is None:
+        return caesar_result or affine_result
+    
+    # Every shift is also an affine key, so the affine winner never fits the
+    # letter frequencies worse; it must read more dictionary words, or fit
+    # clearly better when the text has no word breaks
+    affine_words = count_dictionary_words(affine_result['text'], affine_result['language'])
+    caesar_words = count_dictionary_words(caesar_result['text'], caesar_result['language'])
+    if affine_words > caesar_words or (
+            not affine_words and not caesar_words and affine_result['score'] > caesar_result['score'] + 50):
+        return affine_result
+    return caesar_result
+
+def choose_best_result(caesar_result, substitution_result):
+    """Order the Caesar (or affine) and substitution winners as (best_result, alternative)."""
+    if caesar_result is None or substitution_result is None:
+        return caesar_result or substitution_result, None
+    
+    # A shift is the simpler key: keep it when it reads as many dictionary words
+    # as the substitution winner, whose word bonus would otherwise outscore it
+    # (texts without word breaks have no dictionary words to compare)
+    caesar_words = count_dictionary_words(caesar_result['text'], caesar_result['language'])
+    if caesar_words and caesar_words >= count_dictionary_words(
+            substitution_result['text'], substitution_result['language']):
+        return caesar_result, substitution_result
+    
+    # Prefer substitution result if it has significantly better score or expert analysis
+    if (substitution_result['score'] > caesar_result['score'] + 50 or 
+        'Expert' in substitution_result['method']):
+        return substitution_result, caesar_result
+    return caesar_result, substitution_result
+
+def choose_polyalphabetic(vigenere_result, best_result, alternative):
+    """Put the Vigenère result first unless the best monoalphabetic one reads more dictionary words."""
+    if vigenere_result is None:
+        return best_result, alternative
+    if best_result is None:
+        return vigenere_result, None
+    
+    # The solver only answers when the coincidence statistics show a periodic
+    # key, so it wins ties, including texts without word breaks
+    if (count_dictionary_words(vigenere_result['text'], vigenere_result['language']) >=
+            count_dictionary_words(best_result['text'], best_result['language'])):
+        return vigenere_result, best_result
+    return best_result, alternative
+
+def vigenere_analysis(ciphertext):
+    """Break a Vigenère cipher, or return None when the text does not look like one."""
+    from vigenere import solve_vigenere
+    
+    solution = solve_vigenere(ciphertext)
+    if solution is None:
+        return None
+    
+    lang = solution['language']
+    progress(f"    🔑 Vigenère key of length {solution['period']} (coincidence index {solution['ioc']:.3f}): {solution['keyword']}")
+    return {
+        'text': solution['text'],
+        'score': calculate_language_score(solution['text'], language_frequencies(lang)),
+        'keyword': solution['keyword'],
+        'period': solution['period'],
+        'method': f'Vigenère Cipher ({lang.title()})',
+        'language': lang
+    }
+
+def result_confidence(result):
+    """Share of a result's words that are dictionary words in its language (0 to 1)."""
+    words = text_words(result['text'])
+    if not words:
+        return 0.0
+    return get_dictionary(result['language']).count_tokens(words) / len(words)
+
+def decrypt_text_parallel(text, use_ai=False, search=False, restarts=10, deadline=None,
+                          confidence=DEFAULT_CONFIDENCE, workers=None):
+    """Run the attack strategies in worker processes under a shared deadline.
+    
+    The first strategy whose best result reaches the confidence threshold
+    (share of dictionary words) stops the others; when the deadline passes,
+    the best result found so far is used. AI refinement, if enabled, runs
+    afterwards on the substitution candidates with the time left.
+    """
+    from strategy_executor import run_strategies
+    
+    started = time.perf_counter()
+    strategies = [
+        ('caesar', try_all_caesar_shifts, (text,)),
+        ('affine', try_all_affine_keys, (text,)),
+        ('substitution', substitution_candidates, (text,)),
+        ('vigenere', vigenere_analysis, (text,)),
+    ]
+    if search:
+        for lang in ['english', 'french']:
+            progress(f"    🧗 Hill-climbing key search ({lang.title()}, {restarts} restarts)...")
+            strategies.append((f'hill_climb_{lang}', hill_climb_substitution, (text, lang, restarts)))
+    
+    def is_confident(name, result):
+        # Of a list of substitution candidates, only the best-scoring one can be reported
+        candidate = max(result, key=lambda x: x['score']) if isinstance(result, list) and result else result
+        return bool(candidate) and result_confidence(decrypt_result(candidate, text)) >= confidence
+    
+    with stage('strategies'):
+        outcome = run_strategies(strategies, deadline=deadline, is_confident=is_confident, workers=workers)
+    for name, seconds in outcome['seconds'].items():
+        record_stage(f'strategy_{name}', seconds)
+    for name, error in outcome['errors'].items():
+        progress(f"    ⚠️  Strategy {name} failed: {error}")
+    if outcome['stopped'] == 'confident':
+        progress(f"    🎯 {outcome['confident']} reached {confidence:.0%} dictionary words; other strategies stopped")
+    elif outcome['stopped'] == 'deadline':
+        record_stage('deadline_stop', 0.0)
+        unfinished = [name for name, _, _ in strategies if name not in outcome['seconds']]
+        progress(f"    ⏰ Deadline of {deadline:g}s reached; stopped {', '.join(unfinished)}")
+    
+    results = outcome['results']
+    substitution_results = list(results.get('substitution', []))
+    if use_ai and substitution_results and ai_refinement_available():
+        remaining = None if deadline is None else deadline - (time.perf_counter() - started)
+        if remaining is None or remaining > 0:
+            timeout = GEMINI_TIMEOUT if remaining is None else min(GEMINI_TIMEOUT, remaining)
+            substitution_results += refine_substitution_results(substitution_results, text, timeout=timeout)
+        else:
+            record_stage('deadline_stop', 0.0)
+    substitution_results += [result for name, result in results.items() if name.startswith('hill_climb_') and result]
+    
+    substitution_result = best_substitution_result(substitution_results, text) if substitution_results else None
+    return choose_polyalphabetic(results.get('vigenere'),
+                                 *choose_best_result(choose_shift_or_affine(results.get('caesar'), results.get('affine')),
+                                                     substitution_result))
+
+def analyze(text, use_ai=False, search=False, restarts=10, verbose=False, parallel=False, deadline=None,
+            confidence=DEFAULT_CONFIDENCE, search_workers=1, cache=False, language='auto', on_detected=None):
+    """Detect and decrypt text, returning an AnalysisResult.
+    
+    Nothing is printed unless verbose is set, in which case each method's
+    progress is shown as it runs. Stage timings go to the active profiler
+    if there is one (see profiler.use_profiler), and are part of the result.
+    parallel, deadline, confidence and search_workers are passed on to decrypt_text.
+    With cache (True for the default AnalysisCache, or an AnalysisCache),
+    a ciphertext analyzed before with the same options is answered from it;
+    language (the --language choice) is one of those options. on_detected,
+    if given, is called with (total_letters, letter_counts, encrypted) once
+    detection is done, before decryption starts (not on a cache hit).
+    """
+    if cache:
+        options = {'use_ai': use_ai, 'search': search, 'restarts': restarts if search else None,
+                   'parallel': parallel or deadline is not None, 'deadline': deadline, 'confidence': confidence,
+                   'language': language}
+        return analyze_with_cache(text, get_analysis_cache() if cache is True else cache, options,
+                                  verbose=verbose, search_workers=search_workers, on_detected=on_detected)
+    
+    profiler = active_profiler() or StageProfiler()
+    with use_profiler(profiler), progress_output(verbose):
+        with stage('letter_frequency'):
+            letter_counts, total_letters = count_letters(text)
+        
+        encrypted = False
+        if total_letters > 0:
+            with stage('detection'):
+                encrypted = is_likely_encrypted(text)
+        
+        if on_detected is not None:
+            on_detected(total_letters, letter_counts, encrypted)
+        
+        best = alternative = None
+        if encrypted:
+            progress("\n🔐 Attempting automatic decryption...")
+            with stage('decryption'):
+                best_result, alternative_result = decrypt_text(text, use_ai=use_ai, search=search, restarts=restarts,
+                                                               parallel=parallel, deadline=deadline, confidence=confidence,
+                                                               search_workers=search_workers)
+            best = Candidate.from_dict(best_result) if best_result else None
+            alternative = Candidate.from_dict(alternative_result) if alternative_result else None
+    
+    return AnalysisResult(total_letters, letter_counts, encrypted, best, alternative, profiler.report())
+
+def analyze_with_cache(text, cache, options, verbose=False, search_workers=1, on_detected=None):
+    """analyze() through an AnalysisCache: serve a stored result, or analyze and store the result."""
+    started = time.perf_counter()
+    cache_key = cache.key(text, options, SOLVER_VERSION, solver_data_fingerprint())
+    entry = cache.get(cache_key)
+    result = cached_result(entry, text) if entry is not None else None
+    if result is not None:
+        cache.record_hit(entry, time.perf_counter() - started)
+        with progress_output(verbose):
+            progress(f"💾 Served from the analysis cache (analysis took {entry['seconds']:.2f}s)")
+        return result
+    
+    cache.record_miss()
+    result = analyze(text, verbose=verbose, search_workers=search_workers, on_detected=on_detected, **options)
+    if not result_complete(result):
+        return result
+    summary = result.to_dict(include_timings=False)
+    for name in ('best', 'alternative'):
+        # Plaintexts are decrypted again from the key on a hit; AI-refined text cannot be
+        if summary[name] and not summary[name].get('ai_refined'):
+            del summary[name]['text']
+    cache.put(cache_key, text, summary, time.perf_counter() - started)
+    return result
+
+def result_complete(result):
+    """False when a deadline or a failed AI refinement cut the analysis short, or it found no decryption."""
+    if result.encrypted and result.best is None:
+        return False
+    stages = result.timings['stages'] if result.timings else {}
+    return not any(path.rsplit('/', 1)[-1] in INCOMPLETE_STAGES for path in stages)
+
+def cached_result(entry, text):
+    """Rebuild the AnalysisResult of a cache entry for text, or None if the entry cannot serve it.
+    
+    Candidates are decrypted again from their key, so texts differing only in
+    case and spacing share an entry; AI-refined text is only reused for the
+    exact text it was refined from.
+    """
+    from analysis_cache import text_digest
+    
+    summary = entry['summary']
+    exact = entry['digest'] == text_digest(text)
+    candidates = {}
+    for name in ('best', 'alternative'):
+        candidate_summary = summary[name]
+        if candidate_summary is None:
+            candidates[name] = None
+        elif 'text' in candidate_summary:
+            if not exact:
+                return None
+            candidates[name] = Candidate.from_summary(candidate_summary)
+        else:
+            candidate = Candidate.from_summary(dict(candidate_summary, text=''))
+            candidate.text = candidate_plaintext(candidate, text)
+            candidates[name] = candidate
+    
+    profiler = active_profiler() or StageProfiler()
+    with use_profiler(profiler), stage('analysis_cache'):
+        letter_counts, total_letters = count_letters(text)
+    return AnalysisResult(total_letters, letter_counts, summary['encrypted'], candidates['best'],
+                          candidates['alternative'], profiler.report())
+
+def candidate_plaintext(candidate, text):
+    """Decrypt text with a candidate's key."""
+    if candidate.keyword is not None:
+        from vigenere import vigenere_decrypt
+        
+        return vigenere_decrypt(text, candidate.keyword)
+    if candidate.affine_key is not None:
+        return apply_key(text, compile_affine(*candidate.affine_key))
+    return apply_key(text, candidate.shift if candidate.shift is not None else candidate.mapping)
+
+def print_cache_stats(cache, file=None):
+    """Print the hit rate and time saved of an AnalysisCache."""
+    stats = cache.stats()
+    file = file or sys.stderr
+    
+    def rate(value):
+        return 'n/a' if value is None else f'{value:.0%}'
+    
+    print(f"💾 Analysis cache: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB", file=file)
+    print(f"  This run: {stats['hits']} hits, {stats['misses']} misses (hit rate {rate(stats['hit_rate'])}), "
+          f"{stats['seconds_saved']:.2f}s saved", file=file)
+    print(f"  All runs: {stats['total_hits']} hits, {stats['total_misses']} misses "
+          f"(hit rate {rate(stats['total_hit_rate'])}), {stats['total_seconds_saved']:.2f}s saved", file=file)
+
+def analyze_text(text, show_graph=False, use_ai=False, search=False, restarts=10, profiler=None, **options):
+    """Analyze text and print the report of the best translation, returning the AnalysisResult.
+    
+    Stage timings are recorded on profiler (a StageProfiler) when one is given;
+    other keyword options (parallel, deadline, confidence, search_workers, cache, language) go to analyze().
+    """
+    if profiler is not None:
+        with use_profiler(profiler):
+            return analyze_text(text, show_graph, use_ai, search, restarts, **options)
+    
     print("🔍 LUKIN E NIMI KON - Automatic Translation")
     print("=" * 50)
     print(f"Input: {text[:60]}{'...' if len(text) > 60 else ''}")
     
-    if use_ai and GEMINI_AVAILABLE:
+    if use_ai and ai_refinement_available():
         print("🤖 AI assistance enabled")
-    elif use_ai and not GEMINI_AVAILABLE:
+    elif use_ai:
         print("⚠️  AI assistance requested but not available (install google-genai)")
     
-    # Basic frequency analysis
-    frequencies, total_letters = analyze_letter_frequency(text)
+    # The statistics head the report, ahead of the decryption progress lines
+    shown = []
+    
+    def show_statistics(total_letters, letter_counts, encrypted):
+        render_statistics(total_letters, letter_counts, encrypted)
+        shown.append(True)
+    
+    result = analyze(text, use_ai=use_ai, search=search, restarts=restarts, verbose=True,
+                     on_detected=show_statistics, **options)
+    render_analysis(result, show_graph, statistics=not shown)
+    return result
+
+def render_statistics(total_letters, letter_counts, encrypted):
+    """Print the letter count, the top letters and the detection outcome."""
     print(f"Total letters analyzed: {total_letters}")
     
     if total_letters == 0:
@@ -515,90 +1215,153 @@ def analyze_text(text, show_graph=False, use_ai=False):
         return
     
     # Show top frequent letters
+    frequencies = frequencies_from_counts(letter_counts, total_letters)
     sorted_freq = sorted(frequencies.items(), key=lambda x: x[1]['count'], reverse=True)
     print("\nTop 5 most frequent letters:")
     for i, (letter, data) in enumerate(sorted_freq[:5], 1):
         if data['count'] > 0:
             print(f"  {i}. '{letter}': {data['count']} times ({data['percentage']:.1f}%)")
     
-    # Determine if text appears encrypted
-    likely_encrypted = is_likely_encrypted(text)
-    print(f"\nEncryption detected: {'Yes' if likely_encrypted else 'No'}")
+    print(f"\nEncryption detected: {'Yes' if encrypted else 'No'}")
+
+def render_analysis(result, show_graph=False, statistics=True):
+    """Print the report of an AnalysisResult, optionally with frequency graphs.
     
-    if not likely_encrypted:
-        print("✅ Text appears to be in plain text already.")
-        if show_graph:
-            create_frequency_graph(frequencies, "Plain Text - Letter Frequencies")
+    statistics=False leaves out the part render_statistics() already printed.
+    """
+    if statistics:
+        render_statistics(result.total_letters, result.letter_counts, result.encrypted)
+    if result.total_letters == 0:
         return
+    frequencies = frequencies_from_counts(result.letter_counts, result.total_letters)
     
-    print("\n🔐 Attempting automatic decryption...")
-    
-    # Try Caesar cipher
-    caesar_result = try_all_caesar_shifts(text)
-    
-    # Try substitution cipher with expert analysis
-    substitution_result = frequency_substitution_analysis(text, use_ai=use_ai)
-    
-    # Compare results and pick the best
-    caesar_lang, _, caesar_words_list = detect_language(caesar_result['text'])
-    
-    # Count recognizable words in Caesar result
-    caesar_text_lower = caesar_result['text'].lower()
-    caesar_words = caesar_text_lower.split()
-    
-    recognizable_caesar_words = 0
-    for word in caesar_words:
-        if len(word) >= 2:
-            if (word in caesar_words_list or 
-                (caesar_lang == 'english' and (word.endswith('ing') or word.endswith('ed') or word.endswith('ly') or word.startswith('th'))) or
-                (caesar_lang == 'french' and (word.endswith('er') or word.endswith('ir') or word.endswith('re') or word.startswith('le')))):
-                recognizable_caesar_words += 1
+    if not result.encrypted or result.best is None:
+        if result.encrypted:
+            print("❌ No strategy finished before the deadline.")
+        else:
+            print("✅ Text appears to be in plain text already.")
+        if show_graph:
+            with stage('graph'):
+                create_frequency_graph(frequencies, "Plain Text - Letter Frequencies")
+        return
     
-    # Prefer substitution result if it has significantly better score or expert analysis
-    if (substitution_result['score'] > caesar_result['score'] + 50 or 
-        'Expert' in substitution_result['method']):
-        best_result = substitution_result
-        alternative = caesar_result
-    else:
-        best_result = caesar_result
-        alternative = substitution_result
+    best_result, alternative = result.best, result.alternative
     
     # Output results
-    print(f"\n✅ BEST TRANSLATION ({best_result['method']}):")
+    print(f"\n✅ BEST TRANSLATION ({best_result.method}):")
     print("=" * 50)
-    print(best_result['text'])
-    print(f"\nConfidence Score: {best_result['score']:.1f}")
+    print(best_result.text)
+    print(f"\nConfidence Score: {best_result.score:.1f}")
     
-    if 'language' in best_result:
-        print(f"Detected Language: {best_result['language'].title()}")
+    if best_result.language:
+        print(f"Detected Language: {best_result.language.title()}")
     
-    if 'shift' in best_result:
-        print(f"Caesar Shift: {best_result['shift']}")
-    elif 'mapping' in best_result:
+    if best_result.shift is not None:
+        print(f"Caesar Shift: {best_result.shift}")
+    elif best_result.affine_key is not None:
+        print(f"Affine Key: a={best_result.affine_key[0]}, b={best_result.affine_key[1]}")
+    elif best_result.keyword is not None:
+        print(f"Vigenère Key: {best_result.keyword} (length {best_result.period})")
+    elif best_result.mapping is not None:
         print("\nSubstitution mapping (top 10):")
-        mapping_items = sorted(best_result['mapping'].items())[:10]
+        mapping_items = sorted(best_result.mapping.items())[:10]
         mapping_str = " | ".join([f"{k}→{v}" for k, v in mapping_items if isinstance(v, str)])
         print(f"  {mapping_str}")
     
     # Show comparison with alternative
-    print(f"\nAlternative ({alternative['method']}):")
-    print(f"  {alternative['text'][:60]}{'...' if len(alternative['text']) > 60 else ''}")
-    print(f"  Score: {alternative['score']:.1f}")
-    
-    if 'shift' in alternative:
-        print(f"  Caesar Shift: {alternative['shift']}")
-    if 'language' in alternative:
-        print(f"  Language: {alternative['language'].title()}")
+    if alternative is not None:
+        print(f"\nAlternative ({alternative.method}):")
+        print(f"  {alternative.text[:60]}{'...' if len(alternative.text) > 60 else ''}")
+        print(f"  Score: {alternative.score:.1f}")
+        
+        if alternative.shift is not None:
+            print(f"  Caesar Shift: {alternative.shift}")
+        elif alternative.affine_key is not None:
+            print(f"  Affine Key: a={alternative.affine_key[0]}, b={alternative.affine_key[1]}")
+        elif alternative.keyword is not None:
+            print(f"  Vigenère Key: {alternative.keyword}")
+        if alternative.language:
+            print(f"  Language: {alternative.language.title()}")
     
     if show_graph:
-        decrypted_freq, _ = analyze_letter_frequency(best_result['text'])
-        create_frequency_graph(decrypted_freq, f"Decrypted Text - {best_result['method']}")
+        with stage('graph'):
+            decrypted_freq, _ = analyze_letter_frequency(best_result.text)
+            create_frequency_graph(decrypted_freq, f"Decrypted Text - {best_result.method}")
+
+def print_triage(path, text, as_json=False):
+    """Print the sampled encryption verdict for a file or a text."""
+    from encryption_triage import triage_file, triage_text
+    
+    try:
+        report = triage_file(path, get_lexicon('all')) if path else triage_text(text, get_lexicon('all'))
+    except OSError as e:
+        print(f"❌ Error reading file: {e}")
+        return
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    verdict = "🔐 Likely encrypted" if report['encrypted'] else "📖 Likely plain text"
+    basis = 'settled' if report['settled'] else 'undecided after all samples'
+    print(f"{verdict} ({report['why']}; {basis})")
+    share = report['readable_share']
+    print(f"  Samples: {report['samples']}, letters: {report['letters']}, words: {report['words']}")
+    if share is not None:
+        low, high = report['readable_bounds']
+        print(f"  Dictionary words: {share:.1%} (99% bounds {low:.1%}-{high:.1%})")
+    low, high = report['ioc_bounds']
+    print(f"  Coincidence index: {report['ioc']:.4f} (99% bounds {max(low, 0):.4f}-{high:.4f})")
+
+def decrypt_file(path, output, sample_bytes=None, **options):
+    """Find the key on a sample of a file and stream-decrypt all of it to output (a path, or '-' for stdout).
+    
+    The key is solved on the first sample_bytes of the file (default:
+    stream_decrypt.DEFAULT_SAMPLE_BYTES). Reports go to stderr, since stdout
+    may carry the plaintext. Returns an exit status. options go to analyze().
+    """
+    from stream_decrypt import DEFAULT_SAMPLE_BYTES, read_sample, stream_decrypt_file, stream_key
+    
+    sample_bytes = sample_bytes or DEFAULT_SAMPLE_BYTES
+    try:
+        sample = read_sample(path, sample_bytes)
+    except OSError as e:
+        print(f"❌ Error reading file: {e}", file=sys.stderr)
+        return 1
+    
+    result = analyze(sample, **options)
+    if result.best is None:
+        print("❌ No key found: the sample does not look encrypted, or no method could decrypt it", file=sys.stderr)
+        return 1
+    key = stream_key(result.best)
+    print(f"🔑 {result.best.method}, key {result.best.key!r}, solved on {len(sample)} characters", file=sys.stderr)
+    
+    started = time.perf_counter()
+    try:
+        if output == '-':
+            written = stream_decrypt_file(path, sys.stdout.buffer, key)
+        else:
+            with open(output, 'wb') as out:
+                written = stream_decrypt_file(path, out, key)
+    except OSError as e:
+        print(f"❌ Error decrypting file: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    where = 'stdout' if output == '-' else output
+    print(f"✅ Decrypted {written} bytes to {where} in {elapsed:.2f}s", file=sys.stderr)
+    return 0
 
-def main():
+def main(argv=None):
     """Main function with command line argument support."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['batch']:
+        from batch_analyzer import batch_main
+        return batch_main(argv[1:])
+    if argv[:1] == ['serve']:
+        from analysis_server import serve_main
+        return serve_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description='lukin e nimi kon v1.0.0 - Advanced automatic cipher detection and decryption',
-        epilog='Examples:\n  python cipher_analyzer.py "encrypted text"\n  python cipher_analyzer.py -f cipher.txt -g\n  python cipher_analyzer.py --demo\n  python cipher_analyzer.py "complex cipher" --ai',
+        epilog='Examples:\n  python cipher_analyzer.py "encrypted text"\n  python cipher_analyzer.py -f cipher.txt -g\n  python cipher_analyzer.py --demo\n  python cipher_analyzer.py "complex cipher" --ai\n  python cipher_analyzer.py batch intercepts/ -w 8 > results.jsonl\n  python cipher_analyzer.py serve --port 8642',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument('text', nargs='?', help='Text to analyze (or use --file)')
@@ -609,18 +1372,72 @@ def main():
     parser.add_argument('--demo', action='store_true', help='Run with demo Caesar cipher')
     parser.add_argument('--freq-only', action='store_true', help='Show only frequency analysis (no decryption)')
     parser.add_argument('--ai', action='store_true', help='Enable Gemini AI refinement to perfect decoded text')
+    parser.add_argument('--ai-offline', action='store_true', help='Use only cached AI refinements, never the network (implies --ai)')
+    parser.add_argument('--search', action='store_true', help='Search for the substitution key with hill-climbing (slower)')
+    parser.add_argument('--restarts', type=int, default=10, help='Random restarts for --search (default: 10)')
+    parser.add_argument('--search-workers', type=int, default=1, metavar='N',
+                        help='Processes sharing the --search restarts (default: 1)')
+    parser.add_argument('--parallel', action='store_true', help='Run the Caesar and substitution strategies in parallel worker processes')
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help='Time budget for the strategies; the best result so far is used when it runs out (implies --parallel)')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help=f'Share of dictionary words at which a parallel strategy stops the others (default: {DEFAULT_CONFIDENCE})')
+    parser.add_argument('--triage', action='store_true',
+                        help='Only tell whether the text looks encrypted, from sampled windows (constant time on large files)')
+    parser.add_argument('--decrypt-to', metavar='PATH',
+                        help="Solve the key on a sample of --file, then decrypt the whole file in chunks to PATH ('-' for stdout)")
+    parser.add_argument('--sample-bytes', type=int, metavar='N',
+                        help='Bytes of the file the --decrypt-to key is solved on (default: 65536)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Answer ciphertexts analyzed before (same options) from the local analysis cache')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='Print the analysis cache hit rate and time saved to stderr (implies --cache; alone, just print them)')
+    parser.add_argument('--clear-cache', action='store_true', help='Empty the analysis cache and exit')
+    parser.add_argument('--json', action='store_true', help='Print the analysis result as JSON instead of the report')
+    parser.add_argument('--profile', action='store_true', help='Print per-stage wall/CPU times and call counts as JSON to stderr')
+    parser.add_argument('--profile-file', metavar='PATH', help='Write the per-stage timings JSON to a file (implies --profile)')
+    parser.add_argument('--cprofile', metavar='PATH', help='Run under cProfile and write the report to PATH (raw stats if it ends in .prof)')
+    parser.add_argument('--tracemalloc', metavar='PATH', help='Trace memory allocations and write the top allocation sites to PATH')
     parser.add_argument('--version', action='version', version='lukin e nimi kon v1.0.0')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.ai_offline:
+        os.environ['LUKIN_AI_OFFLINE'] = '1'
+        args.ai = True
+    
+    if args.clear_cache:
+        get_analysis_cache().clear()
+        print("🧹 Analysis cache cleared", file=sys.stderr)
+        return
+    if args.cache_stats:
+        args.cache = True
+        if not (args.text or args.file or args.demo):
+            print_cache_stats(get_analysis_cache(), sys.stdout)
+            return
+    
+    if args.triage and (args.file or args.text):
+        return print_triage(args.file, args.text, args.json)
+    if args.decrypt_to:
+        if not args.file:
+            parser.error('--decrypt-to needs --file')
+        return decrypt_file(args.file, args.decrypt_to, args.sample_bytes, use_ai=args.ai, search=args.search,
+                            restarts=args.restarts, search_workers=args.search_workers, cache=args.cache)
     
     # Get input text
+    letter_counts = None
     if args.demo:
         text = "WKH TXLFN EURZQ IRA MXPSV RYHU WKH ODCB GRJ"
-        print("🎯 Demo Mode: Using sample Caesar cipher")
+        # stdout carries only the result document in --json mode
+        print("🎯 Demo Mode: Using sample Caesar cipher", file=sys.stderr if args.json else sys.stdout)
     elif args.file:
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                text = f.read().strip()
+            if args.freq_only:
+                # Count the file in chunks; only a preview is kept in memory
+                letter_counts = count_file(args.file)
+                text = read_preview(args.file)
+            else:
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    text = f.read().strip()
         except FileNotFoundError:
             print(f"❌ Error: File '{args.file}' not found.")
             return
@@ -645,7 +1462,8 @@ def main():
     if args.freq_only:
         print("🔍 LUKIN E NIMI KON - Frequency Analysis Only")
         print("=" * 50)
-        frequencies, total = analyze_letter_frequency(text)
+        counts, total = letter_counts if letter_counts is not None else count_letters(text)
+        frequencies = frequencies_from_counts(counts, total)
         
         if total == 0:
             print("❌ No letters found to analyze!")
@@ -655,20 +1473,20 @@ def main():
         print(f"Analyzing: {text[:80]}{'...' if len(text) > 80 else ''}")
         print(f"Total letters: {total}")
         
-        # Calculate language scores
-        english_score = calculate_language_score(text, ENGLISH_FREQ)
-        french_score = calculate_language_score(text, FRENCH_FREQ)
+        # Calculate language scores against every profile
+        profiles = get_profiles()
+        scores = profiles.scores(counts, total)
         
         print(f"\nLanguage similarity scores:")
-        print(f"  English: {english_score:.1f}")
-        print(f"  French:  {french_score:.1f}")
+        width = max(len(language) for language in profiles.names) + 1
+        for language, score in zip(profiles.names, scores):
+            print(f"  {language.title() + ':':<{width}} {score:.1f}")
         
-        if french_score > english_score:
-            print("  → Text appears more similar to French patterns")
-        elif english_score > french_score:
-            print("  → Text appears more similar to English patterns")
-        else:
+        ranked = sorted(zip(scores, profiles.names), reverse=True)
+        if len(ranked) > 1 and ranked[0][0] == ranked[1][0]:
             print("  → Text similarity is ambiguous")
+        else:
+            print(f"  → Text appears more similar to {ranked[0][1].title()} patterns")
         
         if args.graph:
             create_frequency_graph(frequencies, "Frequency Analysis Only")
@@ -677,7 +1495,31 @@ def main():
         return
     
     # Analyze the text
-    analyze_text(text, args.graph, args.ai)
+    strategy_options = {'parallel': args.parallel, 'deadline': args.deadline, 'confidence': args.confidence,
+                        'search_workers': args.search_workers, 'cache': args.cache, 'language': args.language}
+    if args.json:
+        def run_analysis():
+            result = analyze(text, use_ai=args.ai, search=args.search, restarts=args.restarts, **strategy_options)
+            print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        def run_analysis():
+            analyze_text(text, args.graph, args.ai, search=args.search, restarts=args.restarts, **strategy_options)
+    
+    if not (args.profile or args.profile_file or args.cprofile or args.tracemalloc):
+        run_analysis()
+    else:
+        profiler = StageProfiler()
+        with use_profiler(profiler):
+            run_profiled(run_analysis, cprofile_path=args.cprofile, tracemalloc_path=args.tracemalloc, profiler=profiler)
+        if args.profile_file:
+            with open(args.profile_file, 'w', encoding='utf-8') as f:
+                f.write(profiler.to_json() + '\n')
+            print(f"\n⏱️  Stage timings written to {args.profile_file}", file=sys.stderr)
+        else:
+            print(profiler.to_json(), file=sys.stderr)
+    
+    if args.cache_stats:
+        print_cache_stats(get_analysis_cache())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Persistent Result Cache
+
+A small content-addressed key/value store backed by a local SQLite file, with
+TTL expiry and least-recently-used eviction by entry count or total size.
+Values are JSON documents. Hits are also kept in an in-process dictionary,
+so repeated lookups within one run cost a dictionary access (and, at most
+once a minute per entry, a write of its access time for eviction).
+
+Settings (environment variables):
+    LUKIN_CACHE_DIR   directory of the cache file (default: ~/.cache/lukin-e-nimi-kon)
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# An entry served from memory has its access time written back at most this
+# often, so repeated hits keep it recent for eviction without a write each
+TOUCH_SECONDS = 60.0
+
+def default_cache_dir():
+    """Directory holding the cache database."""
+    return os.getenv('LUKIN_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'lukin-e-nimi-kon')
+
+def make_cache_key(*parts):
+    """Stable SHA-256 key for any JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DiskCache:
+    """SQLite-backed cache namespace with TTL and LRU size eviction."""
+
+    def __init__(self, namespace, path=None, max_entries=10000, max_bytes=None, ttl=None):
+        self.namespace = namespace
+        self.path = path or os.path.join(default_cache_dir(), 'cache.sqlite3')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._touched = {}
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        """Open the database once per process (connections must not cross a fork)."""
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+                ' size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+            self._memory = {}
+            self._touched = {}
+        return self._connection
+
+    def _expired(self, created):
+        """True when an entry created at the given time is past the TTL."""
+        return self.ttl is not None and created < time.time() - self.ttl
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss."""
+        cached = self._memory.get(key)
+        if cached is not None and not self._expired(cached[0]):
+            if time.time() - self._touched.get(key, 0.0) >= TOUCH_SECONDS:
+                self._touch(self._connect(), key)
+            self.hits += 1
+            return cached[1]
+
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT value, created FROM entries WHERE namespace = ? AND key = ?',
+            (self.namespace, key)
+        ).fetchone()
+        if row is None or self._expired(row[1]):
+            self.misses += 1
+            return default
+
+        self._touch(connection, key)
+        value = json.loads(row[0])
+        self._memory[key] = (row[1], value)
+        self.hits += 1
+        return value
+
+    def _touch(self, connection, key):
+        """Mark an entry as just used, for least-recently-used eviction."""
+        now = time.time()
+        connection.execute(
+            'UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?',
+            (now, self.namespace, key)
+        )
+        self._touched[key] = now
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key and evict old entries if needed."""
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        connection = self._connect()
+        connection.execute(
+            'INSERT OR REPLACE INTO entries (namespace, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)',
+            (self.namespace, key, encoded, len(encoded), now, now)
+        )
+        self._memory[key] = (now, value)
+        self._touched[key] = now
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones beyond the size limits."""
+        connection = self._connect()
+        changes_before = connection.total_changes
+        if self.ttl is not None:
+            connection.execute(
+                'DELETE FROM entries WHERE namespace = ? AND created < ?',
+                (self.namespace, time.time() - self.ttl)
+            )
+        if self.max_entries is not None:
+            connection.execute(
+                'DELETE FROM entries WHERE namespace = ? AND key IN ('
+                ' SELECT key FROM entries WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.namespace, self.namespace, self.max_entries)
+            )
+        if self.max_bytes is not None:
+            connection.execute(
+                'DELETE FROM entries WHERE namespace = ? AND key IN ('
+                ' SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS running'
+                ' FROM entries WHERE namespace = ?) WHERE running > ?)',
+                (self.namespace, self.namespace, self.max_bytes)
+            )
+        if connection.total_changes != changes_before:
+            self._memory.clear()
+            self._touched.clear()
+
+    def add(self, key, amounts):
+        """Add numbers to the counters stored under key, atomically across processes, and return the totals."""
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT value FROM entries WHERE namespace = ? AND key = ?', (self.namespace, key)
+            ).fetchone()
+            totals = json.loads(row[0]) if row else {}
+            for name, amount in amounts.items():
+                totals[name] = totals.get(name, 0) + amount
+            encoded = json.dumps(totals)
+            now = time.time()
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (namespace, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)',
+                (self.namespace, key, encoded, len(encoded), now, now)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._memory.pop(key, None)
+        return totals
+
+    def clear(self):
+        """Remove every entry of this namespace."""
+        self._connect().execute('DELETE FROM entries WHERE namespace = ?', (self.namespace,))
+        self._memory.clear()
+        self._touched.clear()
+
+    def stats(self):
+        """Entry count, stored bytes and this process's hit/miss counters."""
+        entries, size = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?',
+            (self.namespace,)
+        ).fetchone()
+        return {'entries': entries, 'bytes': size, 'hits': self.hits, 'misses': self.misses}
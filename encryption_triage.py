@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Sampled Encryption Triage
+
+A yes/no answer to "is this text encrypted?" without reading all of it.
+The input is cut into equal strata and one window is read from each, in
+an order that spreads the first windows over the whole input. After each
+window the letter counts, the index of coincidence and the share of
+dictionary words are updated with confidence bounds, and sampling stops
+as soon as the same checks as cipher_analyzer.is_likely_encrypted() are
+settled either way. At most SAMPLE_COUNT windows of SAMPLE_CHARS
+characters are read, so a multi-megabyte file costs the same as a small one.
+
+Usage:
+    report = triage_text(text, lexicon)
+    report = triage_file('intercept.txt', lexicon)
+    report['encrypted']  # True or False
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import math
+import os
+import random
+
+from frequency_counter import count_letters
+from vigenere import POLYALPHABETIC_IOC, index_of_coincidence
+
+# Windows read at most, their length, and the fewest read before deciding
+SAMPLE_COUNT = 32
+SAMPLE_CHARS = 4096
+MIN_SAMPLES = 4
+
+# Normal quantile of the confidence bounds (two-sided 99%)
+CONFIDENCE_Z = 2.576
+
+# Same thresholds as the full check: fewer letters are never encrypted,
+# and texts reading fewer dictionary words than this share are
+MIN_LETTERS = 10
+READABLE_SHARE = 0.5
+
+_E = ord('e') - ord('a')
+_COMMON = tuple(ord(letter) - ord('a') for letter in 'tain')
+
+def wilson_interval(hits, trials, z=CONFIDENCE_Z):
+    """Wilson score interval of a proportion observed as hits out of trials."""
+    if trials == 0:
+        return 0.0, 1.0
+    share = hits / trials
+    denominator = 1 + z * z / trials
+    centre = (share + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(share * (1 - share) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+def mean_interval(values, z=CONFIDENCE_Z):
+    """Mean of per-window values with its normal confidence bounds."""
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, (0.0, 1.0)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    spread = z * math.sqrt(variance / len(values))
+    return mean, (mean - spread, mean + spread)
+
+def sample_offsets(length, count=SAMPLE_COUNT, size=SAMPLE_CHARS):
+    """Start offsets of the windows, one per stratum, in the order they are read.
+
+    Strata are visited in bit-reversed order, so every prefix of the list
+    is spread over the whole input; the window starts at a random (but
+    reproducible) place in its stratum. Short inputs are read whole.
+    """
+    if length <= count * size:
+        return list(range(0, length, size))
+    stratum = length / count
+    rng = random.Random(length)
+    starts = [int(index * stratum) + rng.randrange(max(int(stratum) - size, 1)) for index in range(count)]
+    bits = max((count - 1).bit_length(), 1)
+    order = sorted(range(count), key=lambda index: int(format(index, f'0{bits}b')[::-1], 2))
+    return [starts[index] for index in order]
+
+def _whole_words(window, at_start, at_end):
+    """Tokens of a window, without the words cut off at its edges."""
+    tokens = window.lower().split()
+    if tokens and not at_start and not window[:1].isspace():
+        tokens = tokens[1:]
+    if tokens and not at_end and not window[-1:].isspace():
+        tokens = tokens[:-1]
+    return tokens
+
+def _rank_settled(counts, letters, z):
+    """Whether some letter of letters is in the top three counts: True, False, or None if not yet clear.
+
+    A letter is surely in the top three when it leads the fourth-ranked
+    count, and surely out when it trails the third-ranked one, by more
+    than z standard deviations of the difference of two Poisson counts.
+    """
+    ranked = sorted(counts, reverse=True)
+    third, fourth = ranked[2], ranked[3]
+    undecided = False
+    for letter in letters:
+        count = counts[letter]
+        if count - fourth > z * math.sqrt(count + fourth):
+            return True
+        if not third - count > z * math.sqrt(count + third):
+            undecided = True
+    return None if undecided else False
+
+def _top_three(counts, letters):
+    """Whether some letter of letters is among the three most frequent, by point estimate."""
+    top = sorted(range(26), key=lambda index: counts[index], reverse=True)[:3]
+    return any(letter in top and counts[letter] > 0 for letter in letters)
+
+def triage_windows(windows, lexicon, z=CONFIDENCE_Z, min_samples=MIN_SAMPLES):
+    """Decide from (window, at_start, at_end) tuples, stopping once the decision is settled.
+
+    Returns a report dict: encrypted, settled (False when the windows ran
+    out first and the point estimates decided), why, and the sampled
+    letters, words, readable share and coincidence index with their bounds.
+    """
+    counts = [0] * 26
+    letters = words = readable = samples = 0
+    coincidences = []
+    encrypted, settled, why = False, False, 'too few letters'
+
+    for window, at_start, at_end in windows:
+        samples += 1
+        window_counts, window_letters = count_letters(window)
+        for index, count in enumerate(window_counts):
+            counts[index] += count
+        letters += window_letters
+        if window_letters >= 2:
+            coincidences.append(index_of_coincidence(window_counts, window_letters))
+        tokens = _whole_words(window, at_start, at_end)
+        words += len(tokens)
+        readable += lexicon.count_tokens(tokens, short_length=2)
+
+        if samples < min_samples or letters < MIN_LETTERS:
+            continue
+        ioc_high = mean_interval(coincidences, z)[1][1] if len(coincidences) >= min_samples else 1.0
+        share_low, share_high = wilson_interval(readable, words, z) if words else (1.0, 1.0)
+        e_on_top = _rank_settled(counts, (_E,), z)
+        common_on_top = _rank_settled(counts, _COMMON, z)
+
+        if ioc_high < POLYALPHABETIC_IOC:
+            encrypted, settled, why = True, True, 'flat letter distribution'
+        elif share_high < READABLE_SHARE:
+            encrypted, settled, why = True, True, 'few dictionary words'
+        elif e_on_top is False or common_on_top is False:
+            encrypted, settled, why = True, True, 'unusual letter frequencies'
+        elif share_low >= READABLE_SHARE and e_on_top and common_on_top:
+            encrypted, settled, why = False, True, 'readable text'
+        if settled:
+            break
+
+    if not settled and letters >= MIN_LETTERS:
+        # Out of windows: decide as the full check would on what was read
+        share = readable / words if words else 1.0
+        frequency_off = not _top_three(counts, (_E,)) or not _top_three(counts, _COMMON)
+        encrypted = frequency_off or share < READABLE_SHARE
+        why = 'point estimates'
+
+    ioc, ioc_bounds = mean_interval(coincidences, z) if coincidences else (0.0, (0.0, 1.0))
+    return {
+        'encrypted': encrypted,
+        'settled': settled,
+        'why': why,
+        'samples': samples,
+        'letters': letters,
+        'words': words,
+        'readable_share': readable / words if words else None,
+        'readable_bounds': wilson_interval(readable, words, z),
+        'ioc': ioc,
+        'ioc_bounds': ioc_bounds,
+    }
+
+def triage_text(text, lexicon, **options):
+    """Sampled triage of a string (see triage_windows for options and the report)."""
+    length = len(text)
+    windows = ((text[start:start + SAMPLE_CHARS], start == 0, start + SAMPLE_CHARS >= length)
+               for start in sample_offsets(length))
+    return triage_windows(windows, lexicon, **options)
+
+def triage_file(path, lexicon, encoding='utf-8', **options):
+    """Sampled triage of a file, reading only its windows.
+
+    Windows are byte ranges; characters split at their edges are dropped.
+    """
+    size = os.path.getsize(path)
+
+    def windows():
+        with open(path, 'rb') as f:
+            for start in sample_offsets(size):
+                f.seek(start)
+                data = f.read(SAMPLE_CHARS)
+                yield data.decode(encoding, 'ignore'), start == 0, start + len(data) >= size
+
+    return triage_windows(windows(), lexicon, **options)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Streaming Letter Frequency Counter
+
+Shared letter counting for the analyzer and the frequency viewer. ASCII
+letters are counted with bulk bytes operations (one lower() and 26 count()
+calls per block, all in C), and files are read in fixed-size chunks so
+memory stays constant however large the input is.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import codecs
+import re
+import string
+from collections import Counter
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_LETTER_BYTES = string.ascii_lowercase.encode('ascii')
+_NON_ASCII_RUNS = re.compile('[^\x00-\x7f]+')
+
+def _add_ascii_counts(data, counts):
+    """Add the a-z/A-Z counts of a bytes block to counts and return how many letters it held."""
+    lowered = data.lower()  # bytes.lower() only touches ASCII letters
+    total = 0
+    for index, letter in enumerate(_LETTER_BYTES):
+        count = lowered.count(letter)
+        counts[index] += count
+        total += count
+    return total
+
+def _add_unicode_counts(chars, counts):
+    """Add non-ASCII characters to counts and return how many letters they held."""
+    total = 0
+    for char, count in Counter(chars).items():
+        if not char.isalpha():
+            continue
+        lowered = char.lower()
+        total += len(lowered) * count
+        for lower_char in lowered:
+            index = ord(lower_char) - ord('a')
+            if 0 <= index < 26:
+                counts[index] += count
+    return total
+
+def add_text_counts(text, counts):
+    """Add the letters of a string to a 26-entry count list and return how many letters it held."""
+    if text.isascii():
+        return _add_ascii_counts(text.encode('ascii'), counts)
+    # ASCII bytes never occur inside UTF-8 multi-byte sequences, so the encoded
+    # text can be counted directly; only the non-ASCII runs need Python
+    total = _add_ascii_counts(text.encode('utf-8', 'surrogatepass'), counts)
+    return total + _add_unicode_counts(''.join(_NON_ASCII_RUNS.findall(text)), counts)
+
+def count_letters(text):
+    """Count each a-z letter in one pass, returning a 26-entry count list and the total letter count."""
+    counts = [0] * 26
+    total_letters = add_text_counts(text, counts)
+    return counts, total_letters
+
+def iter_file_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a file's contents as bytes blocks of at most chunk_size."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+class LetterCounter:
+    """Running letter counts of a bytes stream that is fed one block at a time."""
+
+    __slots__ = ('counts', 'total_letters', 'bytes_read', '_decoder')
+
+    def __init__(self, counts=None, encoding='utf-8'):
+        self.counts = counts if counts is not None else [0] * 26
+        self.total_letters = 0
+        self.bytes_read = 0
+        # Keeps a multi-byte character split across two blocks until it is complete
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def add(self, chunk):
+        """Count one more block and return how many letters it held."""
+        added = _add_ascii_counts(chunk, self.counts)
+        if not chunk.isascii():
+            # Accented letters still count toward the total, as in analyze_letter_frequency
+            text = self._decoder.decode(chunk)
+            added += _add_unicode_counts(''.join(_NON_ASCII_RUNS.findall(text)), self.counts)
+        self.total_letters += added
+        self.bytes_read += len(chunk)
+        return added
+
+    def finish(self):
+        """Count whatever the decoder still holds at the end of the stream."""
+        added = _add_unicode_counts(self._decoder.decode(b'', final=True), self.counts)
+        self.total_letters += added
+        return added
+
+    def frequencies(self):
+        """The counts so far as a {letter: {'count', 'percentage'}} frequency dict."""
+        return frequencies_from_counts(self.counts, self.total_letters)
+
+def count_chunks(chunks, counts=None, encoding='utf-8'):
+    """Count the letters of a stream of bytes blocks, returning (counts, total_letters)."""
+    counter = LetterCounter(counts, encoding)
+    for chunk in chunks:
+        counter.add(chunk)
+    counter.finish()
+    return counter.counts, counter.total_letters
+
+def count_file(path, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8'):
+    """Count the letters of a file in fixed-size chunks, returning (counts, total_letters)."""
+    return count_chunks(iter_file_chunks(path, chunk_size), encoding=encoding)
+
+def read_preview(path, size=4096, encoding='utf-8'):
+    """Read the beginning of a file for display without loading the rest."""
+    with open(path, 'rb') as f:
+        return f.read(size).decode(encoding, errors='ignore').strip()
+
+def frequencies_from_counts(counts, total_letters):
+    """Turn 26 letter counts into the {letter: {'count', 'percentage'}} frequency dict."""
+    frequencies = {}
+    for index, letter in enumerate(string.ascii_lowercase):
+        count = counts[index]
+        percentage = (count / total_letters * 100) if total_letters > 0 else 0
+        frequencies[letter] = {'count': count, 'percentage': percentage}
+    return frequencies
+
+def analyze_letter_frequency(text):
+    """Analyze the frequency of each letter in the given text."""
+    counts, total_letters = count_letters(text)
+    return frequencies_from_counts(counts, total_letters), total_letters
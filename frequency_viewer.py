@@ -10,41 +10,24 @@ License: MIT
 Version: 1.0.0
 """
 
-import matplotlib.pyplot as plt
 import string
-from collections import Counter
 import argparse
+import queue
 import sys
+import threading
+import time
 
-# Expected letter frequencies in English (percentages)
-ENGLISH_FREQ = {
-    'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7, 's': 6.3, 'h': 6.1,
-    'r': 6.0, 'd': 4.3, 'l': 4.0, 'c': 2.8, 'u': 2.8, 'm': 2.4, 'w': 2.4, 'f': 2.2,
-    'g': 2.0, 'y': 2.0, 'p': 1.9, 'b': 1.3, 'v': 1.0, 'k': 0.8, 'j': 0.15, 'x': 0.15,
-    'q': 0.10, 'z': 0.07
-}
-
-# Expected letter frequencies in French (percentages)
-FRENCH_FREQ = {
-    'e': 14.7, 'a': 7.6, 'i': 7.5, 't': 7.2, 'n': 7.1, 'r': 6.6, 's': 6.5, 'u': 6.3,
-    'l': 5.5, 'o': 5.4, 'm': 3.0, 'd': 3.7, 'c': 3.3, 'p': 3.0, 'h': 0.9, 'g': 1.1,
-    'b': 0.9, 'v': 1.6, 'j': 0.5, 'f': 1.1, 'q': 1.4, 'z': 0.3, 'x': 0.4, 'w': 0.1,
-    'y': 0.2, 'k': 0.05
-}
-
-def analyze_letter_frequency(text):
-    """Analyze the frequency of each letter in the given text."""
-    letters_only = ''.join(char.lower() for char in text if char.isalpha())
-    letter_counts = Counter(letters_only)
-    total_letters = len(letters_only)
-    
-    frequencies = {}
-    for letter in string.ascii_lowercase:
-        count = letter_counts.get(letter, 0)
-        percentage = (count / total_letters * 100) if total_letters > 0 else 0
-        frequencies[letter] = {'count': count, 'percentage': percentage}
-    
-    return frequencies, total_letters
+from frequency_counter import (
+    DEFAULT_CHUNK_SIZE, LetterCounter, analyze_letter_frequency, count_file, frequencies_from_counts, read_preview
+)
+from language_profiles import get_profiles, language_frequencies
+
+# Expected letter frequencies in English and French (percentages), from profiles/
+ENGLISH_FREQ = language_frequencies('english')
+FRENCH_FREQ = language_frequencies('french')
+
+# Seconds between checks for new data at the end of a followed file
+FOLLOW_POLL_INTERVAL = 0.2
 
 def print_frequency_table(frequencies, total_letters):
     """Print a detailed frequency table."""
@@ -67,6 +50,13 @@ def print_frequency_table(frequencies, total_letters):
 
 def create_comparison_graph(frequencies, title="Letter Frequency Comparison"):
     """Create a comparison graph showing text vs English vs French frequencies."""
+    # Imported here so that table-only runs do not pay for loading matplotlib
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️  Graph skipped: matplotlib is not installed")
+        return
+    
     letters = list(string.ascii_lowercase)
     text_freqs = [frequencies[letter]['percentage'] for letter in letters]
     english_freqs = [ENGLISH_FREQ[letter] for letter in letters]
@@ -117,14 +107,37 @@ def calculate_language_similarity(frequencies):
     
     return english_score, french_score
 
-def analyze_text_frequency(text, show_graph=True, show_table=True):
-    """Main function to analyze text frequency."""
+def closest_language(letter_counts, total_letters):
+    """Name and score of the language profile the counts fit best."""
+    profiles = get_profiles()
+    scores = profiles.scores(letter_counts, total_letters)
+    index = max(range(len(scores)), key=scores.__getitem__)
+    return profiles.names[index], scores[index]
+
+def similarity_verdict(english_score, french_score):
+    """One-line reading of the two similarity scores."""
+    if french_score > english_score:
+        return "→ Text appears more similar to French patterns"
+    elif english_score > french_score:
+        return "→ Text appears more similar to English patterns"
+    return "→ Text similarity is ambiguous"
+
+def analyze_text_frequency(text, show_graph=True, show_table=True, letter_counts=None):
+    """Main function to analyze text frequency.
+    
+    letter_counts can hold precomputed (counts, total) for a file that was
+    counted in chunks, in which case text is only a preview for display.
+    """
     print("🔍 LUKIN E NIMI KON - Frequency Viewer")
     print("=" * 50)
     print(f"Analyzing: {text[:80]}{'...' if len(text) > 80 else ''}")
     
     # Analyze frequencies
-    frequencies, total_letters = analyze_letter_frequency(text)
+    if letter_counts is not None:
+        frequencies = frequencies_from_counts(*letter_counts)
+        total_letters = letter_counts[1]
+    else:
+        frequencies, total_letters = analyze_letter_frequency(text)
     
     if total_letters == 0:
         print("❌ No letters found to analyze!")
@@ -142,12 +155,9 @@ def analyze_text_frequency(text, show_graph=True, show_table=True):
     print(f"English similarity: {english_score:.1f}")
     print(f"French similarity:  {french_score:.1f}")
     
-    if french_score > english_score:
-        print("→ Text appears more similar to French patterns")
-    elif english_score > french_score:
-        print("→ Text appears more similar to English patterns")
-    else:
-        print("→ Text similarity is ambiguous")
+    print(similarity_verdict(english_score, french_score))
+    language, score = closest_language([frequencies[letter]['count'] for letter in string.ascii_lowercase], total_letters)
+    print(f"Closest of {len(get_profiles())} language profiles: {language.title()} ({score:.1f})")
     
     # Show top 5 most frequent letters
     sorted_freq = sorted(frequencies.items(), key=lambda x: x[1]['count'], reverse=True)
@@ -161,11 +171,139 @@ def analyze_text_frequency(text, show_graph=True, show_table=True):
     if show_graph:
         create_comparison_graph(frequencies, f"Frequency Analysis: {text[:30]}{'...' if len(text) > 30 else ''}")
 
+def _read_stream(stream, chunks):
+    """Reader thread: pass a byte stream's blocks on as they arrive, then None at the end."""
+    while True:
+        # read1 returns what is available instead of waiting for a full block
+        chunk = stream.read1(DEFAULT_CHUNK_SIZE)
+        if not chunk:
+            chunks.put(None)
+            return
+        chunks.put(chunk)
+
+def _tail_file(f, chunks):
+    """Reader thread: pass on a file's contents, then keep polling for appended data."""
+    while True:
+        chunk = f.read(DEFAULT_CHUNK_SIZE)
+        if chunk:
+            chunks.put(chunk)
+        else:
+            time.sleep(FOLLOW_POLL_INTERVAL)
+
+class LiveChart:
+    """Comparison graph whose text bars are redrawn in place as the counts change."""
+
+    def __init__(self, plt):
+        self.plt = plt
+        letters = list(string.ascii_lowercase)
+        x = range(len(letters))
+        width = 0.25
+
+        plt.ion()
+        self.fig, self.ax = plt.subplots(figsize=(15, 8))
+        self.bars = self.ax.bar([i - width for i in x], [0] * len(letters), width, label='Text', color='lightblue', alpha=0.8)
+        self.ax.bar(x, [ENGLISH_FREQ[letter] for letter in letters], width, label='English Expected', color='lightgreen', alpha=0.8)
+        self.ax.bar([i + width for i in x], [FRENCH_FREQ[letter] for letter in letters], width, label='French Expected', color='lightcoral', alpha=0.8)
+        self.ax.set_xlabel('Letters')
+        self.ax.set_ylabel('Frequency (%)')
+        self.ax.set_xticks(x)
+        self.ax.set_xticklabels(letters)
+        self.ax.legend()
+        self.ax.grid(axis='y', alpha=0.3)
+
+    def update(self, frequencies, total_letters):
+        """Set the text bars to the current percentages and let the window redraw."""
+        for bar, letter in zip(self.bars, string.ascii_lowercase):
+            bar.set_height(frequencies[letter]['percentage'])
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(f"Live Letter Frequency ({total_letters} letters)")
+        self.fig.canvas.draw_idle()
+        self.plt.pause(0.001)
+
+    def keep_open(self):
+        """Block on the final chart once the stream has ended."""
+        self.plt.ioff()
+        self.plt.show()
+
+def print_live_update(counter, show_table=True):
+    """Print the statistics of everything read so far, replacing the previous update on a terminal."""
+    frequencies = counter.frequencies()
+    if sys.stdout.isatty():
+        print("\033[H\033[J", end="")
+    print(f"📡 LIVE FREQUENCY ANALYSIS - {counter.bytes_read:,} bytes read, {time.strftime('%H:%M:%S')}")
+    if counter.total_letters == 0:
+        print("⏳ Waiting for letters...")
+        return frequencies
+    if show_table:
+        print_frequency_table(frequencies, counter.total_letters)
+    else:
+        print(f"Total letters analyzed: {counter.total_letters}")
+
+    english_score, french_score = calculate_language_similarity(frequencies)
+    print(f"\n🎯 English similarity: {english_score:.1f} | French similarity: {french_score:.1f}")
+    print(similarity_verdict(english_score, french_score))
+    language, score = closest_language(counter.counts, counter.total_letters)
+    print(f"Closest of {len(get_profiles())} language profiles: {language.title()} ({score:.1f})")
+    sys.stdout.flush()
+    return frequencies
+
+def follow_frequency(path=None, interval=1.0, show_graph=True, show_table=True):
+    """Follow stdin, or a file as it grows, refreshing the statistics every interval seconds.
+
+    Each block is counted once as it arrives, so a refresh only turns the 26
+    running counts into percentages and similarity scores; earlier data is
+    never read again. Stdin is followed to its end, a file until interrupted.
+    """
+    counter = LetterCounter()
+    chunks = queue.Queue()
+    if path is None:
+        reader = threading.Thread(target=_read_stream, args=(sys.stdin.buffer, chunks), daemon=True)
+    else:
+        # Opened here so that a missing file is reported to the caller
+        reader = threading.Thread(target=_tail_file, args=(open(path, 'rb'), chunks), daemon=True)
+    reader.start()
+
+    chart = None
+    if show_graph:
+        # Imported here so that table-only runs do not pay for loading matplotlib
+        try:
+            import matplotlib.pyplot as plt
+            chart = LiveChart(plt)
+        except ImportError:
+            print("⚠️  Graph skipped: matplotlib is not installed")
+
+    shown = None
+    finished = False
+    next_refresh = time.monotonic()
+    while not finished:
+        try:
+            chunk = chunks.get(timeout=max(0.0, next_refresh - time.monotonic()))
+        except queue.Empty:
+            chunk = b''
+        if chunk is None:
+            counter.finish()
+            finished = True
+        elif chunk:
+            counter.add(chunk)
+
+        if finished or time.monotonic() >= next_refresh:
+            # Redraw only when something new arrived since the last refresh
+            if counter.bytes_read != shown:
+                frequencies = print_live_update(counter, show_table)
+                if chart is not None:
+                    chart.update(frequencies, counter.total_letters)
+                shown = counter.bytes_read
+            next_refresh = max(next_refresh + interval, time.monotonic())
+
+    if chart is not None:
+        chart.keep_open()
+
 def main():
     """Main function with command line support."""
     parser = argparse.ArgumentParser(
         description='lukin e nimi kon - Frequency Viewer v1.0.0\nVisualize letter frequencies and compare with language patterns',
-        epilog='Examples:\n  python frequency_viewer.py "sample text here"\n  python frequency_viewer.py -f textfile.txt\n  python frequency_viewer.py "text" --no-graph --no-table',
+        epilog='Examples:\n  python frequency_viewer.py "sample text here"\n  python frequency_viewer.py -f textfile.txt\n  python frequency_viewer.py "text" --no-graph --no-table\n  tail -f intercept.log | python frequency_viewer.py --follow --no-graph',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
@@ -173,15 +311,36 @@ def main():
     parser.add_argument('-f', '--file', help='Read text from file')
     parser.add_argument('--no-graph', action='store_true', help='Skip showing the comparison graph')
     parser.add_argument('--no-table', action='store_true', help='Skip showing the frequency table')
+    parser.add_argument('--follow', action='store_true',
+                        help='Keep reading stdin (or --file as it grows) and refresh the statistics live')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between refreshes with --follow (default: 1.0)')
     parser.add_argument('--version', action='version', version='lukin e nimi kon - Frequency Viewer v1.0.0')
     
     args = parser.parse_args()
     
+    if args.follow:
+        if args.text:
+            parser.error('--follow reads stdin or --file, not a text argument')
+        if args.interval <= 0:
+            parser.error('--interval must be positive')
+        try:
+            follow_frequency(args.file, args.interval, show_graph=not args.no_graph, show_table=not args.no_table)
+            return 0
+        except FileNotFoundError:
+            print(f"❌ Error: File '{args.file}' not found.")
+            return 1
+        except KeyboardInterrupt:
+            print("\n\n👋 Stopped following.")
+            return 0
+    
     # Get input text
+    letter_counts = None
     if args.file:
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                text = f.read().strip()
+            # Count the file in chunks; only a preview is kept in memory
+            letter_counts = count_file(args.file)
+            text = read_preview(args.file)
         except FileNotFoundError:
             print(f"❌ Error: File '{args.file}' not found.")
             return 1
@@ -207,7 +366,8 @@ def main():
         analyze_text_frequency(
             text, 
             show_graph=not args.no_graph, 
-            show_table=not args.no_table
+            show_table=not args.no_table,
+            letter_counts=letter_counts
         )
         return 0
     except KeyboardInterrupt:
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Key Scoring Engine
+
+Scores substitution keys from count tables of the ciphertext instead of
+from decrypted text. The letter, word and n-gram counts of a ciphertext are
+taken once; after that a key's letter frequency score rearranges the 26
+letter counts, its dictionary word count translates each distinct word
+once, and its n-gram fitness looks up each distinct n-gram once, weighted
+by how often it occurs. Plaintext is only built, with decrypt(), for the
+results that are reported.
+
+Usage:
+    stats = CiphertextStatistics(ciphertext)
+    score = stats.frequency_score(mapping, ENGLISH_FREQ)
+    words = stats.word_count(mapping, get_lexicon('english'), short_length=2)
+    text = stats.decrypt(best_mapping)
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import string
+from collections import Counter
+
+from cipher_kernel import apply_key, compile_key
+from frequency_counter import count_letters
+from language_model import encode_letters
+from word_patterns import text_words
+
+class CiphertextStatistics:
+    """Letter, word and n-gram count tables of one ciphertext, taken once and shared by every key scored."""
+
+    __slots__ = ('ciphertext', 'letter_counts', 'total_letters', 'other_letters',
+                 '_split_words', '_words', '_letter_codes', '_ngrams')
+
+    def __init__(self, ciphertext):
+        self.ciphertext = ciphertext
+        self.letter_counts, self.total_letters = count_letters(ciphertext)
+        # Accented letters count toward the total but no key changes them
+        self.other_letters = self.total_letters - sum(self.letter_counts)
+        self._split_words = None
+        self._words = None
+        self._letter_codes = None
+        self._ngrams = {}
+
+    def plain_counts(self, key):
+        """Letter counts and total of the plaintext under key (a mapping, or 26 plain codes by cipher code)."""
+        if not isinstance(key, dict):
+            counts = [0] * 26
+            for cipher_code, count in enumerate(self.letter_counts):
+                counts[key[cipher_code]] += count
+            return counts, self.total_letters
+
+        counts = [0] * 26
+        total = self.other_letters
+        for cipher_code, count in enumerate(self.letter_counts):
+            if not count:
+                continue
+            replacement = key.get(string.ascii_lowercase[cipher_code])
+            if not isinstance(replacement, str):
+                replacement = string.ascii_lowercase[cipher_code]
+            # Replacements may be several characters ('y': 'qu') or no letter at all
+            for char in replacement.lower():
+                plain_code = ord(char) - ord('a')
+                if 0 <= plain_code < 26:
+                    counts[plain_code] += count
+                    total += count
+                elif char.isalpha():
+                    total += count
+        return counts, total
+
+    def frequency_score(self, key, language_freq):
+        """Negative squared distance between the plaintext's letter percentages and a language's."""
+        counts, total = self.plain_counts(key)
+        if total == 0:
+            return -float('inf')
+
+        score = 0
+        for index, letter in enumerate(string.ascii_lowercase):
+            score -= (counts[index] / total * 100 - language_freq[letter]) ** 2
+        return score
+
+    def word_count(self, mapping, lexicon, short_length=0, split=True):
+        """Dictionary words of the plaintext under mapping, translating each distinct word once.
+
+        With split the words are the whitespace-separated tokens (as counted by
+        count_english_words); otherwise the ASCII words of text_words().
+        """
+        if split:
+            if self._split_words is None:
+                self._split_words = Counter(self.ciphertext.lower().split())
+            words = self._split_words
+        else:
+            if self._words is None:
+                self._words = Counter(text_words(self.ciphertext))
+            words = self._words
+
+        table = compile_key(mapping).str_table
+        lexicon_words = lexicon.words
+        total = 0
+        for word, count in words.items():
+            plain = word.translate(table)
+            if plain in lexicon_words or len(plain) <= short_length:
+                total += count
+        return total
+
+    @property
+    def letter_codes(self):
+        """The ciphertext's letters as codes 0-25, as used for n-gram scoring."""
+        if self._letter_codes is None:
+            self._letter_codes = encode_letters(self.ciphertext)
+        return self._letter_codes
+
+    def ngram_counts(self, ngram_size):
+        """Distinct cipher n-grams (tuples of codes) and how often each occurs, as two parallel lists."""
+        if ngram_size not in self._ngrams:
+            codes = self.letter_codes
+            counts = Counter(zip(*[codes[offset:] for offset in range(ngram_size)]))
+            self._ngrams[ngram_size] = (list(counts), list(counts.values()))
+        return self._ngrams[ngram_size]
+
+    def decrypt(self, key):
+        """The plaintext under key; only needed for results that are reported."""
+        return apply_key(self.ciphertext, key)
+
+def ngram_code(ngram, key):
+    """Base-26 index of a cipher n-gram mapped through key."""
+    index = 0
+    for code in ngram:
+        index = index * 26 + key[code]
+    return index
+
+def ngram_letter_positions(ngrams):
+    """For each cipher letter, the indexes of the distinct n-grams that contain it."""
+    positions = [set() for _ in range(26)]
+    for index, ngram in enumerate(ngrams):
+        for code in ngram:
+            positions[code].add(index)
+    return positions
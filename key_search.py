@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Substitution Key Search
+
+Random-restart hill-climbing over substitution keys, scored with n-gram
+log-probabilities over the ciphertext's distinct n-grams. Restarts are
+independent climbs, so they can run on every core: the n-gram table and
+the encoded ciphertext are placed in multiprocessing.shared_memory once and
+mapped by each worker instead of being pickled to it, and the best fitness
+and key found so far are shared, so a restart that falls far behind the
+best stops climbing early and a restart that shakes up the best key starts
+from the current one.
+
+Usage:
+    best_key, fitness = search_keys(ngrams, counts, ngram_table, rank_key, restarts=200, workers=4)
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import random
+import signal
+from array import array
+
+from key_scoring import ngram_code, ngram_letter_positions
+
+# A restart stops once a full pass leaves it this many log10 units per
+# n-gram behind the best climb so far (climbs that end on the best key are
+# at most about half a unit behind after their first pass)
+EARLY_STOP_GAP = 1.0
+
+# State of a search worker process, set up by _init_search_worker
+_worker = None
+
+def climb_substitution_key(ngrams, counts, ngram_table, key, positions, keep_going=None):
+    """Hill-climb from key (cipher code -> plain code) by swapping letters until no swap helps.
+
+    ngrams and counts are the ciphertext's distinct n-grams and their counts
+    (see CiphertextStatistics.ngram_counts), so each n-gram is scored once
+    however often it occurs; positions lists the n-grams of each cipher
+    letter. keep_going(fitness) is asked after every full pass of swaps;
+    returning False ends the climb where it is.
+    """
+    fitness = sum(count * ngram_table[ngram_code(ngram, key)] for ngram, count in zip(ngrams, counts))
+
+    improved = True
+    while improved:
+        improved = False
+        for first in range(26):
+            for second in range(first + 1, 26):
+                # Only n-grams containing one of the swapped cipher letters change
+                affected = positions[first] | positions[second]
+                if not affected:
+                    continue
+
+                old_part = sum(counts[index] * ngram_table[ngram_code(ngrams[index], key)] for index in affected)
+                key[first], key[second] = key[second], key[first]
+                new_part = sum(counts[index] * ngram_table[ngram_code(ngrams[index], key)] for index in affected)
+
+                if new_part > old_part:
+                    fitness += new_part - old_part
+                    improved = True
+                else:
+                    key[first], key[second] = key[second], key[first]
+
+        if improved and keep_going is not None and not keep_going(fitness):
+            break
+
+    return key, fitness
+
+def restart_key(restart, rank_key, best_key, rng):
+    """Start key of a restart.
+
+    The first climb starts from the frequency-rank key; later restarts shake
+    up the best key found so far with a few random swaps, or start fully at
+    random (every third one, or while no climb has finished yet).
+    """
+    if restart == 0:
+        return list(rank_key)
+    if restart % 3 == 0 or best_key is None:
+        return rng.sample(range(26), 26)
+    start_key = list(best_key)
+    for _ in range(rng.randint(2, 6)):
+        first, second = rng.sample(range(26), 2)
+        start_key[first], start_key[second] = start_key[second], start_key[first]
+    return start_key
+
+def restart_rng(seed, restart):
+    """Random generator of one restart, reproducible for a given seed whichever process runs it."""
+    return random.Random(None if seed is None else seed * 1000003 + restart)
+
+def search_keys(ngrams, counts, ngram_table, rank_key, restarts=10, seed=None, workers=1):
+    """Run the restarts, in-process or on a pool of workers, and return (best_key, best_fitness)."""
+    restarts = max(restarts, 1)
+    if workers and workers > 1 and restarts > 1:
+        return _search_keys_parallel(ngrams, counts, ngram_table, rank_key, restarts, seed, workers)
+
+    positions = ngram_letter_positions(ngrams)
+    margin = EARLY_STOP_GAP * sum(counts)
+    best_key, best_fitness = None, -float('inf')
+    for restart in range(restarts):
+        start_key = restart_key(restart, rank_key, best_key, restart_rng(seed, restart))
+        key, fitness = climb_substitution_key(ngrams, counts, ngram_table, start_key, positions,
+                                              lambda fitness: fitness >= best_fitness - margin)
+        if fitness > best_fitness:
+            best_key, best_fitness = key, fitness
+    return best_key, best_fitness
+
+def _shared_copy(data):
+    """A new shared memory block holding a copy of a bytes-like object."""
+    from multiprocessing import shared_memory
+
+    data = memoryview(data).cast('B')
+    block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    block.buf[:len(data)] = data
+    return block
+
+def _search_keys_parallel(ngrams, counts, ngram_table, rank_key, restarts, seed, workers):
+    """search_keys() on a process pool sharing the tables and the best result."""
+    # Imported here so that sequential analysis does not pay for multiprocessing
+    import multiprocessing
+
+    ngram_size = len(ngrams[0]) if ngrams else 1
+    blocks = [
+        _shared_copy(array('d', ngram_table)),
+        _shared_copy(b''.join(bytes(ngram) for ngram in ngrams)),
+        _shared_copy(array('q', counts)),
+    ]
+    best_fitness = multiprocessing.Value('d', -float('inf'))
+    best_key = multiprocessing.Array('b', 26, lock=False)
+
+    try:
+        initargs = ([block.name for block in blocks], ngram_size, list(rank_key), seed, best_fitness, best_key)
+        with multiprocessing.Pool(processes=min(workers, restarts), initializer=_init_search_worker,
+                                  initargs=initargs) as pool:
+            results = list(pool.imap_unordered(_run_restart, range(restarts)))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    key, fitness = max(results, key=lambda result: result[1])
+    return key, fitness
+
+def _init_search_worker(block_names, ngram_size, rank_key, seed, best_fitness, best_key):
+    """Pool initializer: map the shared tables and keep the shared best result at hand."""
+    from multiprocessing import shared_memory
+
+    global _worker
+    # Ctrl+C is handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Workers share the parent's resource tracker, so the parent alone unlinks the blocks
+    blocks = [shared_memory.SharedMemory(name=name) for name in block_names]
+    table_block, ngram_block, count_block = blocks
+
+    codes = ngram_block.buf
+    counts = count_block.buf.cast('q')
+    ngrams = [codes[start:start + ngram_size] for start in range(0, len(counts) * ngram_size, ngram_size)]
+    _worker = {
+        'blocks': blocks,
+        'ngram_table': table_block.buf.cast('d'),
+        'ngrams': ngrams,
+        'counts': counts,
+        'positions': ngram_letter_positions(ngrams),
+        'margin': EARLY_STOP_GAP * sum(counts),
+        'rank_key': rank_key,
+        'seed': seed,
+        'best_fitness': best_fitness,
+        'best_key': best_key,
+    }
+
+def _run_restart(restart):
+    """One climb in a worker, starting from the shared best key where the schedule says so."""
+    state = _worker
+    best_fitness, best_key = state['best_fitness'], state['best_key']
+    with best_fitness.get_lock():
+        current_key = list(best_key) if best_fitness.value > -float('inf') else None
+
+    start_key = restart_key(restart, state['rank_key'], current_key, restart_rng(state['seed'], restart))
+    key, fitness = climb_substitution_key(state['ngrams'], state['counts'], state['ngram_table'], start_key,
+                                          state['positions'],
+                                          lambda fitness: fitness >= best_fitness.value - state['margin'])
+
+    with best_fitness.get_lock():
+        if fitness > best_fitness.value:
+            best_fitness.value = fitness
+            best_key[:] = key
+    return key, fitness
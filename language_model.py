@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - N-gram Language Model Store
+
+Builds bigram, trigram and quadgram log-probability tables from local corpus
+files and stores them as flat float32 arrays (indexed by the base-26 code of
+each n-gram) in a compact binary file. Loading memory-maps the file, so it
+takes milliseconds and every process that opens the same model shares the
+same physical pages.
+
+Usage:
+    python language_model.py build english corpora/english.txt more_english.txt
+    python language_model.py info models/english.ngrams
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import argparse
+import math
+import mmap
+import os
+import string
+import struct
+import sys
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+# Default corpus files for each language, relative to this directory
+NGRAM_CORPORA = {
+    'english': ['corpora/english.txt', 'sample_texts/english_sample.txt'],
+    'french': ['corpora/french.txt', 'sample_texts/french_sample.txt'],
+}
+
+DEFAULT_NGRAM_SIZES = (2, 3, 4)
+
+# File layout: header, one directory entry per table, then the float32 tables
+MODEL_MAGIC = b'LKNGRAM\x00'
+MODEL_VERSION = 1
+_HEADER = struct.Struct('<8sII')      # magic, version, table count
+_TABLE_ENTRY = struct.Struct('<IfQ')  # n-gram size, floor log-probability, byte offset
+
+# Byte tables mapping a-z / A-Z to letter codes 0-25 and dropping every other byte
+_LETTER_CODES = bytes.maketrans(
+    (string.ascii_lowercase + string.ascii_uppercase).encode('ascii'),
+    bytes(range(26)) * 2
+)
+_NON_LETTER_BYTES = bytes(code for code in range(256) if chr(code) not in string.ascii_letters)
+
+def encode_letters(text):
+    """Encode the letters of a text as bytes holding codes 0-25, dropping everything else."""
+    if not text.isascii():
+        # Strip accents so that 'é' counts as 'e' instead of disappearing
+        text = unicodedata.normalize('NFKD', text)
+    return text.encode('ascii', 'ignore').translate(_LETTER_CODES, _NON_LETTER_BYTES)
+
+def iter_ngram_indexes(letter_codes, ngram_size):
+    """Yield the base-26 index of every n-gram in order, using a rolling index."""
+    modulus = 26 ** (ngram_size - 1)
+    index = 0
+    for pos, code in enumerate(letter_codes):
+        index = (index % modulus) * 26 + code
+        if pos >= ngram_size - 1:
+            yield index
+
+def build_ngram_table(letter_codes, ngram_size):
+    """Build a flat table of log10 n-gram probabilities indexed by base-26 code."""
+    counts = Counter(iter_ngram_indexes(letter_codes, ngram_size))
+    total = sum(counts.values())
+    if total == 0:
+        return [0.0] * (26 ** ngram_size)
+
+    # Unseen n-grams get a small floor probability instead of -infinity
+    table = [math.log10(0.01 / total)] * (26 ** ngram_size)
+    for index, count in counts.items():
+        table[index] = math.log10(count / total)
+    return table
+
+def score_letter_codes(ngram_table, letter_codes, ngram_size):
+    """Total log10 probability of encoded letters under an n-gram table."""
+    return sum(ngram_table[index] for index in iter_ngram_indexes(letter_codes, ngram_size))
+
+def read_corpus(paths):
+    """Read and encode corpus files, skipping the ones that do not exist."""
+    parts = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                parts.append(encode_letters(f.read()))
+    return b''.join(parts)
+
+def default_corpus_paths(language):
+    """Absolute paths of the bundled corpus files for a language."""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(base_dir, path) for path in NGRAM_CORPORA.get(language, [])]
+
+def model_path(language):
+    """Location of the model file for a language (LUKIN_MODEL_DIR overrides models/)."""
+    model_dir = os.getenv('LUKIN_MODEL_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+    return os.path.join(model_dir, f'{language}.ngrams')
+
+def save_model(tables, path):
+    """Write {ngram_size: table} to a model file as little-endian float32 arrays."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    sizes = sorted(tables)
+    offset = _HEADER.size + _TABLE_ENTRY.size * len(sizes)
+    offset += -offset % 8
+
+    entries = []
+    payloads = []
+    for ngram_size in sizes:
+        data = array('f', tables[ngram_size])
+        if sys.byteorder != 'little':
+            data.byteswap()
+        entries.append(_TABLE_ENTRY.pack(ngram_size, min(tables[ngram_size]), offset))
+        payloads.append(data.tobytes())
+        offset += len(payloads[-1])
+
+    # Write to a temporary file first so readers never see a half-written model
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(MODEL_MAGIC, MODEL_VERSION, len(sizes)))
+        f.write(b''.join(entries))
+        f.write(b'\x00' * (-f.tell() % 8))
+        for payload in payloads:
+            f.write(payload)
+    os.replace(temp_path, path)
+
+class NgramModel:
+    """Read-only n-gram tables backed by a memory-mapped model file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"'{path}' is not an n-gram model file")
+
+        magic, version, table_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MODEL_MAGIC or version != MODEL_VERSION:
+            raise ValueError(f"'{path}' is not an n-gram model file (version {MODEL_VERSION})")
+
+        view = memoryview(self._mmap)
+        self.tables = {}
+        self.floors = {}
+        for entry in range(table_count):
+            ngram_size, floor, offset = _TABLE_ENTRY.unpack_from(self._mmap, _HEADER.size + entry * _TABLE_ENTRY.size)
+            raw = view[offset:offset + 4 * 26 ** ngram_size]
+            if sys.byteorder == 'little':
+                table = raw.cast('f')  # zero-copy view into the shared pages
+            else:
+                table = array('f', raw.tobytes())
+                table.byteswap()
+            self.tables[ngram_size] = table
+            self.floors[ngram_size] = floor
+
+    def score(self, text, ngram_size=None):
+        """Total log10 probability of a text's letters (largest n-gram size by default)."""
+        ngram_size = ngram_size or max(self.tables)
+        return score_letter_codes(self.tables[ngram_size], encode_letters(text), ngram_size)
+
+@lru_cache(maxsize=None)
+def _load_model_file(path):
+    """Open a model file once per process."""
+    return NgramModel(path)
+
+def load_language_model(language):
+    """Return the memory-mapped model for a language, or None if it has not been built."""
+    path = model_path(language)
+    if not os.path.exists(path):
+        return None
+    return _load_model_file(path)
+
+def build_language_model(language, corpus_paths=None, ngram_sizes=DEFAULT_NGRAM_SIZES, output=None):
+    """Build the n-gram tables for a language from corpus files and save them."""
+    letter_codes = read_corpus(corpus_paths or default_corpus_paths(language))
+    if not letter_codes:
+        raise ValueError(f"No corpus text found for {language}")
+
+    tables = {ngram_size: build_ngram_table(letter_codes, ngram_size) for ngram_size in ngram_sizes}
+    path = output or model_path(language)
+    save_model(tables, path)
+    return path, len(letter_codes)
+
+def main():
+    """Command line entry point for building and inspecting models."""
+    parser = argparse.ArgumentParser(
+        description='lukin e nimi kon - N-gram language model builder',
+        epilog='Examples:\n  python language_model.py build english\n  python language_model.py build french books/*.txt -o models/french.ngrams\n  python language_model.py info models/english.ngrams',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build a model from corpus files')
+    build_parser.add_argument('language', help='Language name (e.g. english, french)')
+    build_parser.add_argument('corpus', nargs='*', help='Corpus text files (default: bundled corpora)')
+    build_parser.add_argument('-n', '--ngram-sizes', type=int, nargs='+', default=list(DEFAULT_NGRAM_SIZES),
+                              help='N-gram sizes to build (default: 2 3 4)')
+    build_parser.add_argument('-o', '--output', help='Output file (default: models/<language>.ngrams)')
+
+    info_parser = subparsers.add_parser('info', help='Show the tables stored in a model file')
+    info_parser.add_argument('path', help='Model file')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        try:
+            path, letters = build_language_model(args.language, args.corpus, args.ngram_sizes, args.output)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        print(f"✅ Built {args.language} model from {letters} letters: {path}")
+        return 0
+
+    try:
+        model = NgramModel(args.path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    print(f"📦 {args.path}")
+    for ngram_size, table in sorted(model.tables.items()):
+        print(f"  {ngram_size}-grams: {len(table)} entries, floor {model.floors[ngram_size]:.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
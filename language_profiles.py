@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Language Profile Registry
+
+Expected letter frequencies for every supported language, loaded from the
+profile files in profiles/ (one "letter percentage" pair per line) into one
+L x 26 matrix. Scores are the negative squared distance between observed and
+expected percentages, expanded as -(sum(p^2) - 2 p.e + sum(e^2)): sum(p^2) is
+shared by every language and shift and sum(e^2) is stored per language, so
+scoring a candidate against all L languages is L dot products over its
+26-entry count vector, and adding a language costs one row.
+
+Usage:
+    profiles = get_profiles()
+    counts, total = count_letters(text)
+    scores = profiles.scores(counts, total)          # one score per language
+    shifts = profiles.shift_scores(counts, total)    # 26 Caesar shift scores per language
+    keys = profiles.permutation_scores(counts, total, permutations)  # any letter rearrangements
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import os
+import string
+from functools import lru_cache
+from operator import mul
+
+# Listed first, in this order, so that they win ties as they always have
+PRIMARY_LANGUAGES = ('english', 'french')
+
+def profile_dirs():
+    """Directories searched for profiles: the bundled one, then LUKIN_PROFILE_DIR (which overrides it)."""
+    dirs = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')]
+    if os.getenv('LUKIN_PROFILE_DIR'):
+        dirs.append(os.getenv('LUKIN_PROFILE_DIR'))
+    return dirs
+
+def read_profile(path):
+    """Read a profile file ("letter percentage" per line, '#' comments allowed) as 26 percentages."""
+    expected = [0.0] * 26
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                letter, percentage = line.split()
+                index = string.ascii_lowercase.index(letter.lower())
+                expected[index] = float(percentage)
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: expected 'letter percentage', got {line!r}") from None
+    return expected
+
+class LanguageProfiles:
+    """Letter frequency profiles of several languages as one matrix."""
+
+    __slots__ = ('names', 'matrix', '_squares')
+
+    def __init__(self, profiles):
+        # profiles maps language name -> 26 expected percentages, in ranking order
+        self.names = tuple(profiles)
+        self.matrix = [list(profiles[name]) for name in self.names]
+        self._squares = [sum(value * value for value in row) for row in self.matrix]
+
+    def __contains__(self, language):
+        return language in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def frequencies(self, language):
+        """Expected percentages of a language as a {letter: percentage} dict."""
+        return dict(zip(string.ascii_lowercase, self.matrix[self.names.index(language)]))
+
+    def scores(self, letter_counts, total_letters):
+        """Score 26 letter counts against every language, in the order of names."""
+        return [row[0] for row in self._score_rotations(letter_counts, total_letters, (0,))]
+
+    def shift_scores(self, letter_counts, total_letters):
+        """Score all 26 Caesar shifts of the counts against every language: one list of 26 per language."""
+        return self._score_rotations(letter_counts, total_letters, range(26))
+
+    def permutation_scores(self, letter_counts, total_letters, permutations):
+        """Score rearrangements of the counts against every language: one list per language.
+
+        Each permutation lists, for plain letters a to z, the cipher letter that
+        decrypts to it, so any monoalphabetic key can be scored without
+        decrypting the text.
+        """
+        return self._score_arrangements(letter_counts, total_letters, len(permutations),
+                                        lambda percentages: [[percentages[index] for index in permutation]
+                                                             for permutation in permutations])
+
+    def _score_rotations(self, letter_counts, total_letters, shifts):
+        """Score each rotation of the percentages; decrypting with a shift moves cipher letter (i + shift) onto i."""
+        return self._score_arrangements(letter_counts, total_letters, len(shifts),
+                                        lambda percentages: [percentages[shift:] + percentages[:shift]
+                                                             for shift in shifts])
+
+    def _score_arrangements(self, letter_counts, total_letters, size, arrange):
+        """-(sum(p^2) - 2 p.e + sum(e^2)) for each language and each arrangement of the percentages."""
+        if total_letters == 0:
+            return [[-float('inf')] * size for _ in self.names]
+        percentages = [count / total_letters * 100 for count in letter_counts]
+        observed_square = sum(value * value for value in percentages)
+        arrangements = arrange(percentages)
+        return [[2 * sum(map(mul, arrangement, row)) - observed_square - square for arrangement in arrangements]
+                for row, square in zip(self.matrix, self._squares)]
+
+def profile_paths():
+    """Profile file of each language in the profile directories, a later directory's file winning."""
+    paths = {}
+    for directory in profile_dirs():
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.txt'):
+                    paths[name[:-len('.txt')].lower()] = os.path.join(directory, name)
+    return paths
+
+@lru_cache(maxsize=None)
+def get_profiles():
+    """All language profiles found in the profile directories, loaded once per process."""
+    paths = profile_paths()
+    names = [name for name in PRIMARY_LANGUAGES if name in paths]
+    names += sorted(name for name in paths if name not in PRIMARY_LANGUAGES)
+    return LanguageProfiles({name: read_profile(paths[name]) for name in names})
+
+def language_frequencies(language):
+    """Expected letter percentages of a language, falling back to English for unknown ones."""
+    profiles = get_profiles()
+    return profiles.frequencies(language if language in profiles else 'english')
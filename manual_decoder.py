@@ -10,6 +10,8 @@ License: MIT
 Version: 1.0.0
 """
 
+from cipher_kernel import apply_key
+
 def manual_french_decode(ciphertext):
     """Manual decoder based on observed patterns."""
     
@@ -47,12 +49,7 @@ def manual_french_decode(ciphertext):
         'i': 'j',   # appears correct
     }
     
-    result = ""
-    for char in ciphertext.lower():
-        if char in mapping:
-            result += mapping[char]
-        else:
-            result += char
+    result = apply_key(ciphertext.lower(), mapping)
     
     return result
 
@@ -68,12 +65,7 @@ def iterative_decode(ciphertext):
     }
     
     # Apply the mapping
-    result = ""
-    for char in ciphertext.lower():
-        if char in best_mapping:
-            result += best_mapping[char]
-        else:
-            result += char
+    result = apply_key(ciphertext.lower(), best_mapping)
     
     print("Initial decode attempt:")
     print(result)
@@ -90,12 +82,7 @@ def iterative_decode(ciphertext):
         'k': 'k', 'p': 'w', 'r': 'x', 't': 'z', 'i': 'j'
     }
     
-    result2 = ""
-    for char in ciphertext.lower():
-        if char in alt_mapping:
-            result2 += alt_mapping[char]
-        else:
-            result2 += char
+    result2 = apply_key(ciphertext.lower(), alt_mapping)
     
     print("Alternative decode attempt:")
     print(result2)
@@ -109,12 +96,7 @@ def iterative_decode(ciphertext):
         'd': 'f', 'a': 'b', 'l': 'y', 'k': 'qu', 'p': 'u', 'r': 'x', 't': 'z', 'i': 'j'
     }
     
-    result3 = ""
-    for char in ciphertext.lower():
-        if char in refined_mapping:
-            result3 += refined_mapping[char]
-        else:
-            result3 += char
+    result3 = apply_key(ciphertext.lower(), refined_mapping)
     
     print("Refined decode attempt:")
     print(result3)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Stage Profiler
+
+Records wall-clock time, CPU time and call counts for the named stages of an
+analysis (detection, Caesar sweep, each substitution method, Gemini requests,
+graph rendering) and reports them as JSON. Stages nest, so a stage's name is
+its path, e.g. "decryption/substitution/word_pattern_english".
+
+The analysis code marks its stages with stage(); nothing is recorded unless a
+StageProfiler has been activated with use_profiler(), so the unprofiled path
+costs one context variable lookup per stage. The active profiler is a
+context variable, so analyses running at once on different threads (or
+asyncio tasks started from them) record into their own profilers.
+
+Usage:
+    profiler = StageProfiler()
+    analyze_text(text, profiler=profiler)
+    print(profiler.to_json())
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import contextlib
+import contextvars
+import json
+import time
+
+# Profiler collecting the stages of the current run, if any
+_active = contextvars.ContextVar('active_profiler', default=None)
+
+class StageProfiler:
+    """Accumulates wall time, CPU time and calls per stage path."""
+
+    def __init__(self):
+        self.stages = {}
+        self.memory = None
+        self._stack = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def add(self, name, wall, cpu=0.0):
+        """Add one call of a stage, nested under the stages currently open."""
+        path = '/'.join(self._stack + [name])
+        entry = self.stages.setdefault(path, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+        entry['calls'] += 1
+        entry['wall_s'] += wall
+        entry['cpu_s'] += cpu
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage name."""
+        start, cpu_start = time.perf_counter(), time.process_time()
+        self._stack.append(name)
+        try:
+            yield self
+        finally:
+            self._stack.pop()
+            self.add(name, time.perf_counter() - start, time.process_time() - cpu_start)
+
+    def report(self):
+        """Stage timings (in first-seen order) plus run totals as a JSON-serializable dict."""
+        report = {
+            'total_wall_s': time.perf_counter() - self._started,
+            'total_cpu_s': time.process_time() - self._cpu_started,
+            'stages': self.stages,
+        }
+        if self.memory is not None:
+            report['memory'] = self.memory
+        return report
+
+    def to_json(self, indent=2):
+        """The report as a JSON string."""
+        return json.dumps(self.report(), indent=indent)
+
+def active_profiler():
+    """The profiler collecting stages for the current run, or None."""
+    return _active.get()
+
+def stage(name):
+    """Context manager timing a stage on the active profiler (a no-op when none is active)."""
+    profiler = _active.get()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name)
+
+def record_stage(name, wall, cpu=0.0):
+    """Record a stage timed by the caller, e.g. one of several concurrent requests."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.add(name, wall, cpu)
+
+@contextlib.contextmanager
+def use_profiler(profiler):
+    """Make profiler the destination of stage() calls for the enclosed block (in this thread)."""
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+def run_profiled(function, *args, cprofile_path=None, tracemalloc_path=None, profiler=None, **kwargs):
+    """Call function under cProfile and/or tracemalloc, writing their reports to the given paths.
+
+    A cprofile_path ending in .prof gets the raw stats (for snakeviz, pstats);
+    any other path gets a text report sorted by cumulative time. The
+    tracemalloc report lists the top allocation sites; the peak is also
+    added to profiler's report when one is given.
+    """
+    if tracemalloc_path:
+        import tracemalloc
+        tracemalloc.start()
+
+    cprofile = None
+    if cprofile_path:
+        import cProfile
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+
+    try:
+        return function(*args, **kwargs)
+    finally:
+        if cprofile is not None:
+            cprofile.disable()
+            _write_cprofile_report(cprofile, cprofile_path)
+        if tracemalloc_path:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _write_tracemalloc_report(snapshot, current, peak, tracemalloc_path)
+            if profiler is not None:
+                profiler.memory = {'current_bytes': current, 'peak_bytes': peak}
+
+def _write_cprofile_report(cprofile, path, limit=50):
+    """Dump raw stats or a text report of the slowest functions."""
+    import pstats
+
+    if path.endswith('.prof'):
+        cprofile.dump_stats(path)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        stats = pstats.Stats(cprofile, stream=f)
+        stats.sort_stats('cumulative').print_stats(limit)
+
+def _write_tracemalloc_report(snapshot, current, peak, path, limit=30):
+    """Write the peak traced memory and the top allocation sites by size."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"Traced memory: {current / 1024:.1f} KiB current, {peak / 1024:.1f} KiB peak\n\n")
+        f.write(f"Top {limit} allocation sites:\n")
+        for statistic in snapshot.statistics('lineno')[:limit]:
+            f.write(f"{statistic}\n")
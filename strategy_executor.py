@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Strategy Executor
+
+Runs independent decryption strategies (Caesar sweep, substitution methods,
+key searches) side by side in worker processes under one shared deadline.
+Results are collected as they finish; as soon as one passes the caller's
+confidence test, or the deadline passes, the strategies still running are
+terminated and the results gathered so far are returned.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import os
+import queue
+import time
+
+def run_strategies(strategies, deadline=None, is_confident=None, workers=None):
+    """Run (name, function, args) strategies in parallel and collect their results.
+
+    deadline is a time budget in seconds for the whole run (None waits for
+    every strategy). is_confident(name, result) is called on each result as
+    it arrives; returning True stops the run early. Functions must be
+    defined at module level so that worker processes can import them.
+
+    Returns a dict with 'results' and 'errors' ({name: value} in completion
+    order), 'seconds' ({name: wall time until the result arrived}), 'stopped'
+    ('complete', 'confident' or 'deadline') and 'confident' (the name of the
+    strategy that stopped the run, if any).
+    """
+    started = time.perf_counter()
+    outcome = {'results': {}, 'errors': {}, 'seconds': {}, 'stopped': 'complete', 'confident': None}
+    if not strategies:
+        return outcome
+
+    # Imported here so that sequential analysis does not pay for multiprocessing
+    from multiprocessing import Pool
+
+    # Pool callbacks run on a helper thread and hand results over through this queue
+    finished = queue.Queue()
+    pool = Pool(processes=workers or min(len(strategies), os.cpu_count() or 1))
+    try:
+        for name, function, args in strategies:
+            pool.apply_async(
+                function, args,
+                callback=lambda result, name=name: finished.put((name, result, None)),
+                error_callback=lambda error, name=name: finished.put((name, None, error))
+            )
+
+        for _ in range(len(strategies)):
+            remaining = None if deadline is None else deadline - (time.perf_counter() - started)
+            if remaining is not None and remaining <= 0:
+                outcome['stopped'] = 'deadline'
+                break
+            try:
+                name, result, error = finished.get(timeout=remaining)
+            except queue.Empty:
+                outcome['stopped'] = 'deadline'
+                break
+
+            outcome['seconds'][name] = time.perf_counter() - started
+            if error is not None:
+                outcome['errors'][name] = error
+                continue
+            outcome['results'][name] = result
+            if is_confident is not None and is_confident(name, result):
+                outcome['stopped'] = 'confident'
+                outcome['confident'] = name
+                break
+    finally:
+        # Strategies still running are cut short rather than waited for
+        pool.terminate()
+        pool.join()
+
+    return outcome
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Streaming Decryption
+
+Decrypts a file of any size with a key that was found on a sample of it.
+The file is read, decrypted and written in fixed-size chunks by three
+overlapping stages: a reader thread and a writer thread move the bytes
+while the calling thread translates them, with small bounded queues in
+between, so memory stays at a few chunks however large the file is.
+
+One-to-one ASCII keys (Caesar shifts, affine keys, substitution mappings)
+translate the raw UTF-8 bytes directly. Vigenère keys carry the key
+position from one chunk to the next, and mappings with multi-character
+replacements decode the chunks incrementally first.
+
+Usage:
+    sample = read_sample('intercept.txt')
+    key = stream_key(best_candidate)
+    with open('plain.txt', 'wb') as out:
+        stream_decrypt_file('intercept.txt', out, key)
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import codecs
+import queue
+import string
+import threading
+
+from cipher_kernel import compile_affine, compile_key
+from frequency_counter import DEFAULT_CHUNK_SIZE, iter_file_chunks
+from vigenere import shifts_from_keyword, vigenere_decrypt
+
+# Bytes of the file the key is solved on
+DEFAULT_SAMPLE_BYTES = 64 * 1024
+
+# Chunks each queue between the stages may hold
+QUEUE_CHUNKS = 4
+
+_LETTER_BYTES = (string.ascii_lowercase + string.ascii_uppercase).encode('ascii')
+
+def read_sample(path, size=DEFAULT_SAMPLE_BYTES, encoding='utf-8'):
+    """The first size bytes of a file as text, cut after the last whole word."""
+    with open(path, 'rb') as f:
+        data = f.read(size)
+        complete = not f.read(1)
+    text = data.decode(encoding, errors='ignore')
+    if not complete:
+        # A word (or character) cut at the boundary would only add noise
+        end = max(text.rfind(' '), text.rfind('\n'))
+        if end > 0:
+            text = text[:end]
+    return text.strip()
+
+def stream_key(candidate):
+    """The streaming key of an analysis Candidate: a CompiledKey, or a list of Vigenère shifts.
+
+    AI-refined candidates contribute only their mapping; Gemini's edits to
+    the sample are not repeated on the rest of the file.
+    """
+    if candidate.shift is not None:
+        return compile_key(candidate.shift)
+    if candidate.affine_key is not None:
+        return compile_affine(*candidate.affine_key)
+    if candidate.keyword is not None:
+        return shifts_from_keyword(candidate.keyword)
+    if candidate.mapping is not None:
+        return compile_key(candidate.mapping)
+    raise ValueError(f'{candidate.method} has no key to decrypt a stream with')
+
+def decrypt_chunks(chunks, key, encoding='utf-8'):
+    """Decrypt a stream of bytes blocks with a streaming key, yielding bytes blocks."""
+    if isinstance(key, list):
+        yield from _decrypt_vigenere_chunks(chunks, key, encoding)
+    elif key.bytes_table is not None:
+        for chunk in chunks:
+            yield chunk.translate(key.bytes_table)
+    else:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='surrogateescape')
+        for chunk in chunks:
+            yield decoder.decode(chunk).translate(key.str_table).encode(encoding, 'surrogateescape')
+        yield decoder.decode(b'', final=True).translate(key.str_table).encode(encoding, 'surrogateescape')
+
+def _decrypt_vigenere_chunks(chunks, shifts, encoding):
+    """Vigenère decryption of a stream, keeping the key position across chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='surrogateescape')
+    position = 0
+    period = len(shifts)
+
+    def decrypt(text):
+        nonlocal position
+        data = text.encode(encoding, 'surrogateescape')
+        plain = vigenere_decrypt(text, shifts[position:] + shifts[:position]) if period else text
+        # Only ASCII letters move the key on
+        position = (position + len(data) - len(data.translate(None, _LETTER_BYTES))) % max(period, 1)
+        return plain.encode(encoding, 'surrogateescape')
+
+    for chunk in chunks:
+        yield decrypt(decoder.decode(chunk))
+    yield decrypt(decoder.decode(b'', final=True))
+
+def _produce(items, output, stop):
+    """Feed an iterable into a bounded queue, ending with None (or the error that stopped it)."""
+    try:
+        for item in items:
+            if stop.is_set():
+                return
+            output.put(item)
+    except BaseException as e:
+        output.put(e)
+        return
+    output.put(None)
+
+def _drain(source):
+    """Yield the items of a queue filled by _produce, re-raising its error."""
+    while True:
+        item = source.get()
+        if item is None:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+def stream_decrypt(chunks, out, key, encoding='utf-8', queue_chunks=QUEUE_CHUNKS):
+    """Decrypt a stream of bytes blocks into a binary file object, returning the bytes written.
+
+    Reading (from chunks), decryption and writing (to out) run concurrently.
+    """
+    stop = threading.Event()
+    read_queue = queue.Queue(maxsize=queue_chunks)
+    write_queue = queue.Queue(maxsize=queue_chunks)
+    written = 0
+    errors = []
+
+    def write():
+        nonlocal written
+        try:
+            for block in _drain(write_queue):
+                out.write(block)
+                written += len(block)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            # Keep taking blocks so the decrypting thread never blocks on a full queue
+            for _ in iter(write_queue.get, None):
+                pass
+
+    reader = threading.Thread(target=_produce, args=(chunks, read_queue, stop), daemon=True)
+    writer = threading.Thread(target=write, daemon=True)
+    reader.start()
+    writer.start()
+    try:
+        for block in decrypt_chunks(_drain(read_queue), key, encoding):
+            if stop.is_set():
+                break
+            if block:
+                write_queue.put(block)
+    finally:
+        stop.set()
+        write_queue.put(None)
+        writer.join()
+        # Unblock a reader waiting on a full queue
+        while reader.is_alive():
+            try:
+                read_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    if errors:
+        raise errors[0]
+    out.flush()
+    return written
+
+def stream_decrypt_file(path, out, key, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8'):
+    """Decrypt a file chunk by chunk into a binary file object, returning the bytes written."""
+    return stream_decrypt(iter_file_chunks(path, chunk_size), out, key, encoding)
@@ -0,0 +1,105 @@
+"""Tests for the persistent analysis cache (analysis_cache and analyze(cache=...))."""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_analyzer
+from analysis_cache import AnalysisCache
+from disk_cache import DiskCache
+from profiler import record_stage
+
+CAESAR_TEXT = "WKH TXLFN EURZQ IRA MXPSV RYHU WKH ODCB GRJ"
+
+class AnalysisCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(path=os.path.join(self.directory.name, 'cache.sqlite3'))
+
+    def tearDown(self):
+        self.cache.flush()
+        self.directory.cleanup()
+
+    def test_complete_result_is_served_from_cache(self):
+        first = cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+        second = cipher_analyzer.analyze(CAESAR_TEXT.lower(), cache=self.cache)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(second.key, first.key)
+        self.assertEqual(second.text, first.text.lower())
+
+    def test_deadline_result_is_not_cached(self):
+        result = cipher_analyzer.analyze(CAESAR_TEXT, deadline=0.001, cache=self.cache)
+        self.assertIsNone(result.best)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+        cipher_analyzer.analyze(CAESAR_TEXT, deadline=0.001, cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_cut_short_result_with_candidate_is_not_cached(self):
+        def decrypt_text(text, **options):
+            # A deadline that stopped some strategies after others finished
+            record_stage('deadline_stop', 0.0)
+            return cipher_analyzer.try_all_caesar_shifts(text), None
+
+        with mock.patch.object(cipher_analyzer, 'decrypt_text', decrypt_text):
+            result = cipher_analyzer.analyze(CAESAR_TEXT, deadline=5, cache=self.cache)
+        self.assertIsNotNone(result.best)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_timed_out_refinement_is_not_cached(self):
+        def decrypt_text(text, **options):
+            record_stage('gemini_timeout', 0.0)
+            return cipher_analyzer.try_all_caesar_shifts(text), None
+
+        with mock.patch.object(cipher_analyzer, 'decrypt_text', decrypt_text):
+            cipher_analyzer.analyze(CAESAR_TEXT, use_ai=True, cache=self.cache)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_language_option_is_part_of_the_key(self):
+        cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+        cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache, language='english')
+        self.assertEqual(self.cache.stats()['entries'], 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_changed_lexicon_file_is_not_served_stale_results(self):
+        lexicon_dir = os.path.join(self.directory.name, 'lexicons')
+        os.makedirs(lexicon_dir)
+        self.addCleanup(cipher_analyzer.solver_data_fingerprint.cache_clear)
+        with mock.patch.dict(os.environ, {'LUKIN_LEXICON_DIR': lexicon_dir}):
+            cipher_analyzer.solver_data_fingerprint.cache_clear()
+            cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+            with open(os.path.join(lexicon_dir, 'english.txt'), 'w', encoding='utf-8') as f:
+                f.write('quick\n')
+            cipher_analyzer.solver_data_fingerprint.cache_clear()
+            cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_lookups_are_counted_in_memory_until_flushed(self):
+        with mock.patch.object(self.cache.counters, 'add', wraps=self.cache.counters.add) as add:
+            cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+            cipher_analyzer.analyze(CAESAR_TEXT, cache=self.cache)
+            add.assert_not_called()
+            stats = self.cache.stats()
+        self.assertEqual((stats['total_hits'], stats['total_misses']), (1, 1))
+
+    def test_memory_hits_keep_entries_recent_for_eviction(self):
+        disk_cache = DiskCache('lru', self.cache.results.path, max_entries=2)
+        with mock.patch('disk_cache.time.time', return_value=1000.0):
+            disk_cache.set('old', 1)
+        with mock.patch('disk_cache.time.time', return_value=2000.0):
+            disk_cache.set('new', 2)
+        with mock.patch('disk_cache.time.time', return_value=3000.0):
+            # Served from memory, yet recorded as used
+            self.assertEqual(disk_cache.get('old'), 1)
+            disk_cache.set('newest', 3)
+        self.assertEqual(DiskCache('lru', self.cache.results.path).get('old'), 1)
+        self.assertIsNone(DiskCache('lru', self.cache.results.path).get('new'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests for the HTTP endpoints of the analysis server (analysis_server)."""
+
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_server import MAX_BODY_BYTES, AnalysisService, make_server, parse_content_length
+
+CAESAR_TEXT = "WKH TXLFN EURZQ IRA MXPSV RYHU WKH ODCB GRJ"
+
+class AnalysisServerTest(unittest.TestCase):
+
+    workers = 0
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = AnalysisService(workers=cls.workers)
+        cls.server = make_server(cls.service, port=0)
+        cls.port = cls.server.server_address[1]
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+
+    def request(self, method, path, payload=None, connection=None):
+        connection = connection or http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def raw_request(self, head):
+        """Send a request head as is and return the status line of the answer."""
+        with socket.create_connection(('127.0.0.1', self.port), timeout=30) as client:
+            client.sendall(head.encode('ascii'))
+            return client.makefile('rb').readline().decode('ascii')
+
+    def test_analyze_one_text(self):
+        status, result = self.request('POST', '/analyze', {'text': CAESAR_TEXT})
+        self.assertEqual(status, 200)
+        self.assertTrue(result['encrypted'])
+        self.assertEqual(result['best']['text'], 'THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG')
+
+    def test_batch_keeps_order_on_one_connection(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        texts = [CAESAR_TEXT, 'the cat is on the table and the dog is in the house']
+        for _ in range(2):
+            status, body = self.request('POST', '/analyze', {'texts': texts}, connection)
+            self.assertEqual(status, 200)
+            self.assertEqual([result['encrypted'] for result in body['results']], [True, False])
+        connection.close()
+
+    def test_invalid_requests_are_rejected(self):
+        before = self.request('GET', '/metrics')[1]['rejected']
+        for payload in ({'text': 5}, {'texts': ['a', 1]}, {'text': 'a', 'options': {'restarts': True}},
+                        {'text': 'a', 'options': {'verbose': True}}, ['not', 'an', 'object']):
+            with self.subTest(payload=payload):
+                status, body = self.request('POST', '/analyze', payload)
+                self.assertEqual(status, 400)
+                self.assertIn('error', body)
+        self.assertEqual(self.request('GET', '/metrics')[1]['rejected'], before + 5)
+
+    def test_invalid_content_length_gets_400(self):
+        for value in ('abc', '-5', '1.5'):
+            with self.subTest(content_length=value):
+                status_line = self.raw_request(f'POST /analyze HTTP/1.1\r\nHost: x\r\nContent-Length: {value}\r\n\r\n')
+                self.assertIn(' 400 ', status_line)
+
+    def test_oversized_body_gets_413(self):
+        status_line = self.raw_request(
+            f'POST /analyze HTTP/1.1\r\nHost: x\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n')
+        self.assertIn(' 413 ', status_line)
+
+    def test_health_metrics_and_unknown_paths(self):
+        status, health = self.request('GET', '/health')
+        self.assertEqual((status, health['status'], health['workers']), (200, 'ok', self.workers))
+        self.request('POST', '/analyze', {'text': CAESAR_TEXT})
+        status, metrics = self.request('GET', '/metrics')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(metrics['texts'], 1)
+        self.assertEqual(self.request('GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request('POST', '/nowhere', {'text': 'a'})[0], 404)
+
+class PooledAnalysisServerTest(AnalysisServerTest):
+    """The same requests answered by a worker process."""
+
+    workers = 1
+
+class ParseContentLengthTest(unittest.TestCase):
+
+    def test_values(self):
+        self.assertEqual(parse_content_length(None), 0)
+        self.assertEqual(parse_content_length('12'), 12)
+        for value in ('', 'abc', '-1'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_content_length(value)
+
+if __name__ == '__main__':
+    unittest.main()
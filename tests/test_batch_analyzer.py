@@ -0,0 +1,65 @@
+"""Tests for the batch command line (batch_analyzer.batch_main)."""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_analyzer import batch_main
+
+class BatchMainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'results.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_jsonl(self, records):
+        path = os.path.join(self.directory.name, 'messages.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        return path
+
+    def run_batch(self, *argv):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            try:
+                status = batch_main(list(argv))
+            except SystemExit as e:
+                status = e.code
+        return status, stderr.getvalue()
+
+    def read_output(self):
+        with open(self.output, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_successful_batch_exits_zero(self):
+        path = self.write_jsonl([{'id': 'a', 'text': 'WKH TXLFN EURZQ IRA'}])
+        status, _ = self.run_batch(path, '-w', '1', '-o', self.output)
+        self.assertEqual(status, 0)
+        self.assertEqual(self.read_output()[0]['id'], 'a')
+
+    def test_failed_items_give_a_nonzero_status(self):
+        path = self.write_jsonl([{'id': 'a', 'text': 'WKH TXLFN EURZQ IRA'}, {'id': 'b'}])
+        status, stderr = self.run_batch(path, '-w', '1', '-o', self.output)
+        self.assertEqual(status, 1)
+        self.assertIn('(1 errors)', stderr)
+        self.assertEqual(['error' in record for record in self.read_output()], [False, True])
+
+    def test_workers_below_one_are_rejected(self):
+        path = self.write_jsonl([{'text': 'WKH TXLFN EURZQ IRA'}])
+        for workers in ('0', '-2'):
+            status, stderr = self.run_batch(path, '-w', workers, '-o', self.output)
+            self.assertEqual(status, 2)
+            self.assertIn('--workers must be at least 1', stderr)
+
+if __name__ == '__main__':
+    unittest.main()
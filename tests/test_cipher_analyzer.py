@@ -0,0 +1,38 @@
+"""Tests for the command line report of cipher_analyzer."""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_analyzer
+
+CAESAR_TEXT = "Wkh txlfn eurzq ira mxpsv ryhu wkh odcb grj"
+
+class ReportTest(unittest.TestCase):
+
+    def report(self, text):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            cipher_analyzer.analyze_text(text)
+        return output.getvalue()
+
+    def test_statistics_come_before_the_decryption_progress(self):
+        report = self.report(CAESAR_TEXT)
+        order = [report.index(line) for line in (
+            'Total letters analyzed: 35', 'Top 5 most frequent letters:', 'Encryption detected: Yes',
+            'Attempting automatic decryption', 'BEST TRANSLATION')]
+        self.assertEqual(order, sorted(order))
+        self.assertEqual(report.count('Total letters analyzed'), 1)
+        self.assertIn('The quick brown fox jumps over the lazy dog', report)
+
+    def test_plain_text_report(self):
+        report = self.report("the cat is on the table and the dog is in the house")
+        self.assertEqual(report.count('Encryption detected: No'), 1)
+        self.assertNotIn('Attempting automatic decryption', report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests for concurrent Gemini refinement against the local stub (benchmarks/gemini_stub_server.py)."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'benchmarks'))
+
+import cipher_analyzer
+from gemini_stub_server import GeminiStubHandler
+from profiler import StageProfiler, use_profiler
+
+# The stub answers with the text's q and k turned into u and h
+CANDIDATES = [{'text': text, 'method': f'Method {index}', 'language': 'english'}
+              for index, text in enumerate(['tke cat sat', 'tke dog ran', 'qnd tke end', 'tkis is it'])]
+REFINED = [candidate['text'].translate(GeminiStubHandler.fixes) for candidate in CANDIDATES]
+
+DELAY = 0.4
+
+class CountingStubHandler(GeminiStubHandler):
+    delay = DELAY
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with self.lock:
+            CountingStubHandler.requests += 1
+        super().do_POST()
+
+    def log_message(self, format, *args):
+        pass
+
+class GeminiRefinementTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = ThreadingHTTPServer(('127.0.0.1', 0), CountingStubHandler)
+        cls.endpoint = f'http://127.0.0.1:{cls.stub.server_address[1]}'
+        threading.Thread(target=cls.stub.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.shutdown()
+        cls.stub.server_close()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        environment = mock.patch.dict(os.environ, {'LUKIN_CACHE_DIR': directory.name, 'GEMINI_API_KEY': 'stub',
+                                                   'GEMINI_API_ENDPOINT': self.endpoint})
+        environment.start()
+        self.addCleanup(environment.stop)
+        os.environ.pop('LUKIN_AI_OFFLINE', None)
+        # A fresh refinement cache in the temporary directory
+        cipher_analyzer.get_refinement_cache.cache_clear()
+        self.addCleanup(cipher_analyzer.get_refinement_cache.cache_clear)
+
+    def use_stub_over_rest(self):
+        """Send the Gemini requests to the stub with plain HTTP, for runs without the Gemini client."""
+        def generate(prompt, timeout):
+            request = urllib.request.Request(
+                f'{self.endpoint}/v1beta/models/{cipher_analyzer.GEMINI_MODEL}:generateContent',
+                data=json.dumps({'contents': [{'parts': [{'text': prompt}]}]}).encode('utf-8'),
+                headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                answer = json.load(response)
+            return cipher_analyzer.clean_refined_text(answer['candidates'][0]['content']['parts'][0]['text'])
+
+        for patch in (mock.patch.object(cipher_analyzer, 'configure_gemini', return_value=True),
+                      mock.patch.object(cipher_analyzer, '_generate_refinement', generate)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def refine(self, **options):
+        profiler = StageProfiler()
+        started = time.perf_counter()
+        with use_profiler(profiler), cipher_analyzer.progress_output(False):
+            results = cipher_analyzer.refine_candidates(CANDIDATES, 'cipher', **options)
+        return results, time.perf_counter() - started, profiler.stages
+
+    def test_candidates_are_refined_concurrently(self):
+        self.use_stub_over_rest()
+        results, elapsed, stages = self.refine(max_concurrency=4)
+        self.assertEqual([result['text'] for result in results], REFINED)
+        # All four requests overlap: about one delay, not four
+        self.assertLess(elapsed, DELAY * 2)
+        self.assertEqual(stages['gemini_request']['calls'], 4)
+
+    def test_concurrency_limit_is_respected(self):
+        self.use_stub_over_rest()
+        _, elapsed, _ = self.refine(max_concurrency=2)
+        self.assertGreaterEqual(elapsed, DELAY * 2)
+
+    def test_repeated_refinements_come_from_the_cache(self):
+        self.use_stub_over_rest()
+        self.refine()
+        requests = CountingStubHandler.requests
+        results, elapsed, stages = self.refine()
+        self.assertEqual([result['text'] for result in results], REFINED)
+        self.assertEqual(CountingStubHandler.requests, requests)
+        self.assertEqual(stages['gemini_cached']['calls'], 4)
+        self.assertLess(elapsed, DELAY)
+
+    def test_timed_out_requests_are_marked(self):
+        self.use_stub_over_rest()
+        results, elapsed, stages = self.refine(timeout=DELAY / 4)
+        self.assertEqual(results, [None] * 4)
+        self.assertLess(elapsed, DELAY)
+        self.assertEqual(stages['gemini_timeout']['calls'], 4)
+
+    @unittest.skipUnless(cipher_analyzer.gemini_available(), 'google-generativeai is not installed')
+    def test_gemini_client_talks_to_the_stub(self):
+        patch = mock.patch.object(cipher_analyzer, '_gemini_configured', False)
+        patch.start()
+        self.addCleanup(patch.stop)
+        results, elapsed, _ = self.refine(max_concurrency=4)
+        self.assertEqual([result['text'] for result in results], REFINED)
+        self.assertLess(elapsed, DELAY * 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Tests for the per-thread state of concurrent analyses (profiler and progress output)."""
+
+import io
+import os
+import sys
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_analyzer
+from profiler import StageProfiler, active_profiler, record_stage, use_profiler
+
+class ConcurrentAnalysisStateTest(unittest.TestCase):
+
+    def run_together(self, *functions):
+        """Run each function on its own thread, all of them inside their blocks at once."""
+        barrier = threading.Barrier(len(functions))
+        errors = []
+
+        def run(function):
+            try:
+                function(barrier)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(function,)) for function in functions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def test_each_thread_records_into_its_own_profiler(self):
+        profilers = {'first': StageProfiler(), 'second': StageProfiler()}
+
+        def analysis(name):
+            def run(barrier):
+                with use_profiler(profilers[name]):
+                    barrier.wait()
+                    record_stage(f'{name}_stage', 0.0)
+                    barrier.wait()
+            return run
+
+        self.run_together(analysis('first'), analysis('second'))
+        self.assertEqual(list(profilers['first'].stages), ['first_stage'])
+        self.assertEqual(list(profilers['second'].stages), ['second_stage'])
+        self.assertIsNone(active_profiler())
+
+    def test_quiet_analysis_does_not_silence_another_thread(self):
+        output = io.StringIO()
+        printed = []
+
+        def quiet(barrier):
+            with cipher_analyzer.progress_output(False):
+                barrier.wait()
+                barrier.wait()
+
+        def verbose(barrier):
+            with cipher_analyzer.progress_output(True):
+                barrier.wait()
+                cipher_analyzer.progress('verbose line')
+                printed.append(True)
+                barrier.wait()
+
+        with redirect_stdout(output):
+            self.run_together(quiet, verbose)
+        self.assertEqual(printed, [True])
+        self.assertIn('verbose line', output.getvalue())
+
+    def test_concurrent_analyses_keep_their_own_stages(self):
+        text = "WKH TXLFN EURZQ IRA MXPSV RYHU WKH ODCB GRJ"
+        results = []
+
+        def analysis(barrier):
+            barrier.wait()
+            results.append(cipher_analyzer.analyze(text))
+
+        self.run_together(analysis, analysis, analysis)
+        for result in results:
+            self.assertEqual(result.best.shift, 3)
+            self.assertEqual(result.timings['stages']['letter_frequency']['calls'], 1)
+            self.assertEqual(result.timings['stages']['decryption']['calls'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Tests for chunked streaming decryption (stream_decrypt)."""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_analyzer
+from cipher_kernel import apply_key, compile_key
+from stream_decrypt import decrypt_chunks, read_sample, stream_decrypt, stream_decrypt_file
+from vigenere import shifts_from_keyword, vigenere_decrypt
+
+PLAIN = ("Le cœur a ses raisons que la raison ne connaît point. Élève, à l'été!\n"
+         "The quick brown fox jumps over the lazy dog; naïve café owners agree.\n") * 3
+
+def chunks_of(data, size):
+    """data cut into blocks of size bytes, splitting multi-byte characters where they fall."""
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+class StreamDecryptTest(unittest.TestCase):
+
+    def test_vigenere_key_position_carries_across_chunks(self):
+        shifts = shifts_from_keyword('lemon')
+        cipher = vigenere_decrypt(PLAIN, [-shift for shift in shifts])
+        data = cipher.encode('utf-8')
+        for size in range(1, 14):
+            with self.subTest(chunk_size=size):
+                plain = b''.join(decrypt_chunks(chunks_of(data, size), shifts))
+                self.assertEqual(plain.decode('utf-8'), PLAIN)
+
+    def test_multi_character_mapping_across_split_characters(self):
+        key = compile_key({'œ': 'oe', 'é': 'e', 'a': 'b'})
+        self.assertIsNone(key.bytes_table)
+        data = PLAIN.encode('utf-8')
+        for size in range(1, 8):
+            with self.subTest(chunk_size=size):
+                plain = b''.join(decrypt_chunks(chunks_of(data, size), key))
+                self.assertEqual(plain.decode('utf-8'), apply_key(PLAIN, key))
+
+    def test_stream_decrypt_writes_every_byte(self):
+        key = compile_key(23)
+        cipher = apply_key(PLAIN, compile_key(3))
+        out = io.BytesIO()
+        written = stream_decrypt(chunks_of(cipher.encode('utf-8'), 5), out, key, queue_chunks=1)
+        self.assertEqual(out.getvalue().decode('utf-8'), PLAIN)
+        self.assertEqual(written, len(PLAIN.encode('utf-8')))
+
+    def test_stream_decrypt_file_and_sample(self):
+        shifts = shifts_from_keyword('key')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'intercept.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(vigenere_decrypt(PLAIN, [-shift for shift in shifts]))
+            sample = read_sample(path, size=40)
+            self.assertLessEqual(len(sample.encode('utf-8')), 40)
+            self.assertFalse(sample.endswith(' '))
+
+            out = io.BytesIO()
+            stream_decrypt_file(path, out, shifts, chunk_size=11)
+        self.assertEqual(out.getvalue().decode('utf-8'), PLAIN)
+
+    def test_writer_error_is_raised(self):
+        class BrokenOutput(io.BytesIO):
+            def write(self, data):
+                raise OSError('disk full')
+
+        chunks = chunks_of(PLAIN.encode('utf-8') * 20, 16)
+        with self.assertRaises(OSError):
+            stream_decrypt(chunks, BrokenOutput(), compile_key(1), queue_chunks=1)
+
+    def test_decrypt_file_solves_on_sample_and_decrypts_the_rest(self):
+        corpus = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'corpora', 'english.txt')
+        with open(corpus, encoding='utf-8') as f:
+            plain = f.read()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'intercept.txt')
+            output = os.path.join(directory, 'plain.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(apply_key(plain, compile_key(7)))
+            with redirect_stderr(io.StringIO()):
+                status = cipher_analyzer.decrypt_file(path, output, sample_bytes=2048)
+            with open(output, encoding='utf-8') as f:
+                decrypted = f.read()
+        self.assertEqual(status, 0)
+        self.assertEqual(decrypted, plain)
+
+if __name__ == '__main__':
+    unittest.main()
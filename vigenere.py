@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Vigenère Solver
+
+Breaks Vigenère ciphers in two steps. The key length is the period whose
+columns (every period-th letter) have the index of coincidence of natural
+language rather than of random letters. Every candidate period costs one
+C-level counting pass over a bounded sample. Kasiski repeat distances
+decide between periods that fit equally well, such as the true period and
+its multiples. Each column is then a Caesar cipher, solved by rotating its
+letter counts against every language profile, and the text is decrypted a
+column at a time with one translate pass each.
+
+Only ASCII letters carry the key forward; everything else is copied as is.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import re
+import string
+from collections import Counter
+from itertools import accumulate
+
+from cipher_kernel import compile_shift
+from frequency_counter import count_letters
+from language_profiles import get_profiles
+
+_LETTERS = re.compile('[A-Za-z]+')
+
+# Longest key tried, and the fewest letters a column may hold for its statistics to count
+MAX_PERIOD = 100
+MIN_COLUMN_LETTERS = 12
+
+# Letters read to find the period; the columns are solved over the whole text
+PERIOD_SAMPLE_LETTERS = 20000
+KASISKI_SAMPLE_LETTERS = 5000
+
+# Periods whose columns reach this share of a language's coincidence index are candidates
+PERIOD_TOLERANCE = 0.9
+
+# Coincidence index below which a text is not a monoalphabetic cipher of a
+# natural language (English is about 0.066, French 0.078, random letters 0.038),
+# and how much higher the columns of the key length must read
+POLYALPHABETIC_IOC = 0.055
+PERIOD_IOC_GAIN = 1.2
+
+def letters_only(text):
+    """The ASCII letters of a text, in order."""
+    return ''.join(_LETTERS.findall(text))
+
+def index_of_coincidence(letter_counts, total_letters):
+    """Chance that two letters drawn from the counts are the same letter."""
+    if total_letters < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in letter_counts) / (total_letters * (total_letters - 1))
+
+def language_coincidence():
+    """Lowest coincidence index among the language profiles (plain text of any of them reaches it)."""
+    return min(sum((percentage / 100) ** 2 for percentage in row) for row in get_profiles().matrix)
+
+def period_coincidences(letters, max_period=MAX_PERIOD):
+    """Mean column index of coincidence for every period from 1 to max_period."""
+    data = letters.lower().encode('ascii')
+    max_period = min(max_period, len(data) // MIN_COLUMN_LETTERS)
+    coincidences = {}
+    for period in range(1, max_period + 1):
+        total = 0.0
+        for start in range(period):
+            column = data[start::period]
+            total += index_of_coincidence(Counter(column).values(), len(column))
+        coincidences[period] = total / period
+    return coincidences
+
+def kasiski_support(letters, max_period=MAX_PERIOD, ngram_size=3):
+    """For each period, how many distances between repeated n-grams it divides."""
+    last_seen = {}
+    distances = Counter()
+    for start in range(len(letters) - ngram_size + 1):
+        ngram = letters[start:start + ngram_size]
+        if ngram in last_seen:
+            distances[start - last_seen[ngram]] += 1
+        last_seen[ngram] = start
+
+    support = [0] * (max_period + 1)
+    for distance, count in distances.items():
+        for period in range(2, min(max_period, distance) + 1):
+            if distance % period == 0:
+                support[period] += count
+    return support
+
+def find_period(letters, max_period=MAX_PERIOD):
+    """Most likely key length of a Vigenère cipher, with the coincidence index of every period.
+
+    Returns (period, coincidences), or (None, coincidences) when the text does
+    not look polyalphabetic.
+    """
+    coincidences = period_coincidences(letters[:PERIOD_SAMPLE_LETTERS], max_period)
+    if len(coincidences) < 2 or coincidences[1] >= POLYALPHABETIC_IOC:
+        return None, coincidences
+
+    # Columns of the key length, and of its multiples, read like plain text; a
+    # fixed language-level threshold is not fooled by the noisy coincidence
+    # index of long periods, whose columns hold only a few letters
+    threshold = PERIOD_TOLERANCE * language_coincidence()
+    candidates = [period for period, value in coincidences.items() if period > 1 and value >= threshold]
+    if not candidates:
+        return None, coincidences
+
+    # Half the key length mixes two alphabets per column and reads worse than
+    # its double; multiples of the key length read as well but divide no
+    # more repeat distances, so the smallest best-supported one wins
+    candidates = [period for period in candidates
+                  if coincidences[period] >= PERIOD_TOLERANCE * coincidences.get(2 * period, 0.0)]
+    support = kasiski_support(letters[:KASISKI_SAMPLE_LETTERS], max(candidates))
+    period = max(candidates, key=lambda candidate: (support[candidate], -candidate))
+    if coincidences[period] < PERIOD_IOC_GAIN * coincidences[1]:
+        return None, coincidences
+    return period, coincidences
+
+def solve_columns(letters, period):
+    """Best Caesar shift of every column, for the language whose profile they fit best.
+
+    Returns (language, shifts, score) where score sums the columns' frequency scores.
+    """
+    profiles = get_profiles()
+    column_scores = [profiles.shift_scores(*count_letters(letters[start::period])) for start in range(period)]
+
+    best = None
+    for index, language in enumerate(profiles.names):
+        shifts = [max(range(26), key=scores[index].__getitem__) for scores in column_scores]
+        score = sum(scores[index][shift] for scores, shift in zip(column_scores, shifts))
+        if best is None or score > best[2]:
+            best = (language, shifts, score)
+    return best
+
+def keyword_from_shifts(shifts):
+    """The key as a word, e.g. [11, 4, 12, 14, 13] -> 'lemon'."""
+    return ''.join(string.ascii_lowercase[shift % 26] for shift in shifts)
+
+def shifts_from_keyword(keyword):
+    """The shifts of a key word, e.g. 'lemon' -> [11, 4, 12, 14, 13]."""
+    return [string.ascii_lowercase.index(char) for char in keyword.lower() if char in string.ascii_lowercase]
+
+def vigenere_decrypt(text, key):
+    """Decrypt text with a key word or list of shifts (negate the shifts to encrypt), preserving case."""
+    shifts = shifts_from_keyword(key) if isinstance(key, str) else list(key)
+    runs = _LETTERS.findall(text)
+    if not shifts or not runs:
+        return text
+
+    # Decrypt each column of the letters with one translate pass, then put
+    # them back between the untouched non-letter runs
+    period = len(shifts)
+    letters = bytearray(''.join(runs), 'ascii')
+    for start, shift in enumerate(shifts):
+        letters[start::period] = letters[start::period].translate(compile_shift(shift % 26).bytes_table)
+    plain_letters = letters.decode('ascii')
+
+    offsets = [0]
+    offsets.extend(accumulate(map(len, runs)))
+    separators = _LETTERS.split(text)
+    pieces = [''] * (2 * len(separators) - 1)
+    pieces[::2] = separators
+    pieces[1::2] = [plain_letters[start:end] for start, end in zip(offsets, offsets[1:])]
+    return ''.join(pieces)
+
+def solve_vigenere(ciphertext, max_period=MAX_PERIOD):
+    """Recover the key of a Vigenère cipher, or return None when the text does not look like one.
+
+    Returns a dict with 'keyword', 'shifts', 'period', 'language', 'text',
+    'ioc' (coincidence index of the key's columns) and 'column_score'.
+    """
+    letters = letters_only(ciphertext).lower()
+    period, coincidences = find_period(letters, max_period)
+    if period is None:
+        return None
+
+    language, shifts, score = solve_columns(letters, period)
+    if len(set(shifts)) == 1:
+        return None  # one shift throughout is a Caesar cipher
+
+    return {
+        'keyword': keyword_from_shifts(shifts),
+        'shifts': shifts,
+        'period': period,
+        'language': language,
+        'text': vigenere_decrypt(ciphertext, shifts),
+        'ioc': coincidences[period],
+        'column_score': score,
+    }
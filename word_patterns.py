@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+lukin e nimi kon - Word Pattern Solver
+
+Recovers substitution keys from word-separated ciphertext by word pattern
+analysis. Every dictionary word is indexed by its letter-repetition pattern
+("hello" -> "ABCCD"), so the plaintext candidates for a cipher word are a
+single dictionary lookup. A branch-and-bound search then assigns candidate
+words to cipher words, propagating each choice as a constraint on every
+other cipher word (a cipher letter keeps one plaintext letter, and no two
+cipher letters share one) and skipping words that are not in the dictionary.
+
+Author: GitHub Community
+License: MIT
+Version: 1.0.0
+"""
+
+import os
+import re
+import string
+from collections import Counter
+from operator import itemgetter
+
+# Runs of letters; words with accents or other non-ASCII letters are not indexed
+_WORD = re.compile(r'[^\W\d_]+')
+
+def word_pattern(word):
+    """Letter-repetition pattern of a word, e.g. 'hello' -> 'ABCCD'."""
+    seen = {}
+    return ''.join(seen.setdefault(char, string.ascii_uppercase[len(seen)]) for char in word)
+
+def text_words(text):
+    """Lowercase ASCII words of a text, in order."""
+    return [word for word in _WORD.findall(text.lower()) if word.isascii()]
+
+def read_text_words(paths):
+    """Words of the given text files, skipping the ones that do not exist."""
+    words = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                words.extend(text_words(f.read()))
+    return words
+
+def build_pattern_index(words):
+    """Map each letter-repetition pattern to its words, most frequent in words first."""
+    counts = Counter(words)
+    index = {}
+    for word in counts:
+        if word.isascii() and word.isalpha() and len(word) <= 26:
+            index.setdefault(word_pattern(word), []).append(word)
+    # Trying common words first finds the likely key long before rare ones
+    return {pattern: tuple(sorted(group, key=lambda word: (-counts[word], word)))
+            for pattern, group in index.items()}
+
+def _narrow(word, candidates, new_pairs, new_letters):
+    """Candidates of word that agree with the cipher letters just bound in new_pairs."""
+    # Within a word the shared pattern already keeps letters consistent, so a
+    # candidate fits when each newly bound cipher letter of the word reads as
+    # its plaintext letter and no other newly taken plaintext letter appears
+    fixed = [(word.index(char), plain) for char, plain in new_pairs.items() if char in word]
+    if not fixed:
+        return [candidate for candidate in candidates if new_letters.isdisjoint(candidate)]
+    expected = new_letters.intersection(plain for _, plain in fixed)
+    # The fixed letters rule out most candidates, so they are checked first,
+    # all at once (itemgetter returns a single letter for a single position)
+    letters_at = itemgetter(*(position for position, _ in fixed))
+    fixed_letters = fixed[0][1] if len(fixed) == 1 else tuple(plain for _, plain in fixed)
+    return [candidate for candidate in candidates
+            if letters_at(candidate) == fixed_letters
+            and new_letters.intersection(candidate) == expected]
+
+def solve_word_patterns(ciphertext, pattern_index, max_nodes=1000):
+    """Find the partial key that turns the most cipher letters into dictionary words.
+
+    Returns (mapping, matched_words) where mapping is {cipher letter: plain letter}
+    and matched_words is {cipher word: plaintext word} for the words it explains.
+    """
+    counts = Counter(text_words(ciphertext))
+    # Each entry is [cipher word, weight, candidates]; longer and more frequent
+    # words count for more, since they pin down more of the ciphertext
+    entries = [[word, count * len(word), pattern_index[word_pattern(word)]]
+               for word, count in counts.items() if word_pattern(word) in pattern_index]
+
+    best = {'weight': 0, 'mapping': {}, 'matched': {}}
+    nodes = 0
+
+    def search(mapping, matched, weight, remaining, remaining_weight, new_pairs):
+        nonlocal nodes
+        nodes += 1
+        if weight + remaining_weight <= best['weight']:
+            return
+
+        # Forward checking: narrow every open word to the candidates that
+        # still fit the new bindings, dropping the words that have none left
+        if new_pairs:
+            new_letters = frozenset(new_pairs.values())
+            live = []
+            for word, word_weight, candidates in remaining:
+                candidates = _narrow(word, candidates, new_pairs, new_letters)
+                if candidates:
+                    live.append((word, word_weight, candidates))
+        else:
+            live = remaining
+
+        if weight > best['weight']:
+            best.update(weight=weight, mapping=dict(mapping), matched=dict(matched))
+        live_weight = sum(entry[1] for entry in live) if live is not remaining else remaining_weight
+        if not live or weight + live_weight <= best['weight']:
+            return
+
+        # Most constrained word first, heavier words breaking ties
+        entry = min(live, key=lambda item: (len(item[2]), -item[1]))
+        word, word_weight, candidates = entry
+        rest = [item for item in live if item is not entry]
+        rest_weight = live_weight - word_weight
+
+        for candidate in candidates:
+            if nodes >= max_nodes or weight + word_weight + rest_weight <= best['weight']:
+                return
+            added = {char: plain for char, plain in zip(word, candidate) if char not in mapping}
+            matched[word] = candidate
+            search({**mapping, **added}, matched, weight + word_weight, rest, rest_weight, added)
+            del matched[word]
+
+        # The word may simply be missing from the dictionary
+        if nodes < max_nodes:
+            search(mapping, matched, weight, rest, rest_weight, {})
+
+    if entries:
+        search({}, {}, 0, entries, sum(entry[1] for entry in entries), {})
+    return best['mapping'], best['matched']